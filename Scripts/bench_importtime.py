@@ -0,0 +1,99 @@
+"""Measure cold-start import time of the project with ``python -X importtime``.
+
+Each scenario runs in a fresh interpreter, several times, and reports the median
+wall time plus the slowest top-level packages (cumulative import time):
+
+    python Scripts/bench_importtime.py
+    python Scripts/bench_importtime.py --settings core.settings.local --runs 10 --top 15
+
+``--fail-on pandas,numpy`` exits non-zero when one of these packages is imported by a
+scenario that should not need it (useful in CI to keep short commands fast).
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SETUP = "import django; django.setup(); "
+SCENARIOS = {
+    "settings": "from django.conf import settings; settings.INSTALLED_APPS",
+    "django.setup": SETUP,
+    "command:load_data_raw": SETUP + "from django.core.management import load_command_class; "
+                                     "load_command_class('app', 'load_data_raw')",
+    "command:check": SETUP + "from django.core.management import call_command; call_command('check', verbosity=0)",
+}
+# heavy data libraries that only the import/export code paths need
+HEAVY = ("pandas", "numpy", "tqdm", "faker", "pyarrow")
+
+# "import time:       self [us] |  cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse(stderr):
+    """
+    Return cumulative microseconds per top-level package, and the set of packages imported at
+    any depth (a library imported by one of our modules is nested under it, not top-level).
+    """
+    packages = {}
+    imported = set()
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        _, cumulative, indent, name = match.groups()
+        package = name.split(".")[0]
+        imported.add(package)
+        if len(indent) == 1:
+            packages[package] = packages.get(package, 0) + int(cumulative)
+    return packages, imported
+
+
+def run(code, settings):
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return elapsed, *parse(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--settings", default=os.environ.get("DJANGO_SETTINGS_MODULE", "core.settings.local"))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="default: all")
+    parser.add_argument("--fail-on", default="", help="comma separated packages that must not be imported")
+    args = parser.parse_args()
+
+    forbidden = {name.strip() for name in args.fail_on.split(",") if name.strip()}
+    failures = []
+    for name in args.scenario or SCENARIOS:
+        timings = []
+        packages, imported = {}, set()
+        for _ in range(args.runs):
+            elapsed, packages, imported = run(SCENARIOS[name], args.settings)
+            timings.append(elapsed)
+        heavy = sorted(package for package in imported if package in HEAVY)
+        print(f"{name:>22}: median {statistics.median(timings) * 1000:7.1f} ms  "
+              f"min {min(timings) * 1000:7.1f} ms  heavy imports: {', '.join(heavy) or 'none'}")
+        for package, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"{'':>24}{cumulative / 1000:8.1f} ms  {package}")
+        failures.extend(f"{name} imports {package}" for package in heavy if package in forbidden)
+
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Poll the order tracking endpoint with many concurrent clients and compare servers.
+
+Start the same project under both servers, e.g.
+
+    gunicorn core.wsgi -w 4 -b :8001
+    uvicorn core.asgi:application --workers 4 --port 8002
+
+then run
+
+    python Scripts/load_test_tracking.py --order-id <uuid> \
+        --target wsgi=http://localhost:8001 --target asgi=http://localhost:8002
+
+Each client polls like the mobile app does: the first request is a full GET,
+the following ones send If-None-Match with the last ETag.
+"""
+import argparse
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def poll(url, requests_per_client, timeout):
+    etag = None
+    latencies = []
+    statuses = {}
+    for _ in range(requests_per_client):
+        request = urllib.request.Request(url)
+        if etag:
+            request.add_header("If-None-Match", etag)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                status = response.status
+                etag = response.headers.get("ETag", etag)
+        except urllib.error.HTTPError as e:
+            # urllib reports 304 as an error
+            status = e.code
+        except OSError:
+            status = "error"
+        latencies.append(time.perf_counter() - started)
+        statuses[status] = statuses.get(status, 0) + 1
+    return latencies, statuses
+
+
+def run(name, base_url, order_id, concurrency, requests_per_client, timeout):
+    url = f"{base_url.rstrip('/')}/api/orders/{order_id}/tracking/"
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: poll(url, requests_per_client, timeout), range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    statuses = {}
+    for _, result_statuses in results:
+        for status, count in result_statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(
+        f"{name:>6}: {len(latencies) / elapsed:8.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms  "
+        f"statuses {dict(sorted(statuses.items(), key=str))}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--order-id", required=True)
+    parser.add_argument("--target", action="append", required=True,
+                        help="name=base_url, may be repeated (e.g. wsgi=http://localhost:8001)")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    for target in args.target:
+        name, _, base_url = target.partition("=")
+        run(name, base_url, args.order_id, args.concurrency, args.requests, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,173 @@
 from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from app.models import Cart, CartItem, Category, Customer, Geolocation, Order, OrderItem, Payment, Product, Review, Seller
+from app.paginators import EstimatedCountPaginator
 
 # Register your models here.
+
+BRAZIL_STATES = (
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT", "PA",
+    "PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO",
+)
+ORDER_STATUSES = ("approved", "canceled", "created", "delivered", "invoiced", "processing", "shipped", "unavailable")
+PAYMENT_TYPES = ("boleto", "credit_card", "debit_card", "not_defined", "voucher")
+
+
+class FixedChoicesListFilter(admin.SimpleListFilter):
+    """
+    Filter over a fixed list of values. The default filter for a plain field
+    (AllValuesFieldListFilter) runs SELECT DISTINCT over the whole table on every changelist.
+    """
+
+    field_name = None
+    choices = ()
+
+    def lookups(self, request, model_admin):
+        return [(value, value) for value in self.choices]
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        return queryset.filter(**{self.field_name: self.value()})
+
+
+def fixed_choices_filter(field_name, title, choices):
+    return type(f"{field_name.title().replace('_', '')}Filter", (FixedChoicesListFilter,), {
+        "title": title, "parameter_name": field_name, "field_name": field_name, "choices": tuple(choices),
+    })
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Defaults for tables with millions of rows: estimated pagination and no second COUNT(*)."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def get_search_results(self, request, queryset, search_term):
+        # "=field" searches compile to UPPER(col::text) on uuid columns, which cannot use the index:
+        # match the primary/foreign keys exactly instead
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        query = Q()
+        for name in self.get_search_fields(request):
+            field = self.model._meta.get_field(name.lstrip("="))
+            target = field.target_field if field.is_relation else field
+            try:
+                query |= Q(**{field.attname: target.to_python(search_term)})
+            except ValidationError:
+                continue
+        return (queryset.filter(query) if query else queryset.none()), False
+
+
+@admin.register(Geolocation)
+class GeolocationAdmin(LargeTableAdmin):
+    list_display = ("geolocation_zip_code_prefix", "geolocation_city", "geolocation_state", "geolocation_lat", "geolocation_lng")
+    list_filter = (fixed_choices_filter("geolocation_state", "state", BRAZIL_STATES),)
+    search_fields = ("geolocation_zip_code_prefix",)
+    exclude = ("vector",)
+    readonly_fields = ("geolocalization",)
+
+
+@admin.register(Customer)
+class CustomerAdmin(LargeTableAdmin):
+    list_display = ("customer_id", "customer_first_name", "customer_last_name", "customer_city", "customer_state")
+    list_filter = (fixed_choices_filter("customer_state", "state", BRAZIL_STATES),)
+    search_fields = ("customer_id",)
+    raw_id_fields = ("customer_zip_code_prefix",)
+    exclude = ("vector",)
+
+
+@admin.register(Seller)
+class SellerAdmin(LargeTableAdmin):
+    list_display = ("seller_id", "seller_first_name", "seller_last_name", "seller_city", "seller_state")
+    list_filter = (fixed_choices_filter("seller_state", "state", BRAZIL_STATES),)
+    search_fields = ("seller_id",)
+    raw_id_fields = ("seller_zip_code_prefix",)
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ("product_category_name", "product_category_name_english", "parent_category", "depth")
+    list_select_related = ("parent_category",)
+    search_fields = ("product_category_name", "product_category_name_english")
+    autocomplete_fields = ("parent_category",)
+
+
+@admin.register(Product)
+class ProductAdmin(LargeTableAdmin):
+    list_display = ("product_id", "category", "product_weight_g", "product_photo")
+    list_select_related = ("category",)
+    search_fields = ("product_id",)
+    autocomplete_fields = ("category",)
+
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    extra = 0
+    raw_id_fields = ("product", "seller")
+
+
+class PaymentInline(admin.TabularInline):
+    model = Payment
+    extra = 0
+
+
+@admin.register(Order)
+class OrderAdmin(LargeTableAdmin):
+    list_display = ("order_id", "customer", "order_status", "order_purchase_timestamp", "order_delivered_customer_date")
+    list_select_related = ("customer",)
+    list_filter = (fixed_choices_filter("order_status", "status", ORDER_STATUSES),)
+    search_fields = ("order_id",)
+    raw_id_fields = ("customer",)
+    inlines = (OrderItemInline, PaymentInline)
+
+
+@admin.register(OrderItem)
+class OrderItemAdmin(LargeTableAdmin):
+    list_display = ("order_item_id", "order", "product", "seller", "order_item_price", "order_item_freight_value")
+    list_select_related = ("order", "product", "seller")
+    search_fields = ("order",)
+    raw_id_fields = ("order", "product", "seller")
+
+
+@admin.register(Payment)
+class PaymentAdmin(LargeTableAdmin):
+    list_display = ("payment_id", "order", "payment_type", "payment_installments", "payment_value")
+    list_select_related = ("order",)
+    list_filter = (fixed_choices_filter("payment_type", "payment type", PAYMENT_TYPES),)
+    search_fields = ("order",)
+    raw_id_fields = ("order",)
+
+
+@admin.register(Review)
+class ReviewAdmin(LargeTableAdmin):
+    list_display = ("review_id", "order", "review_score", "review_creation_date")
+    list_select_related = ("order",)
+    list_filter = (fixed_choices_filter("review_score", "score", ("1", "2", "3", "4", "5")),)
+    search_fields = ("order",)
+    raw_id_fields = ("order",)
+
+
+class CartItemInline(admin.TabularInline):
+    model = CartItem
+    extra = 0
+    raw_id_fields = ("product",)
+
+
+@admin.register(Cart)
+class CartAdmin(LargeTableAdmin):
+    list_display = ("cart_id", "customer", "cart_total_amount", "updated_at")
+    list_select_related = ("customer",)
+    raw_id_fields = ("customer",)
+    inlines = (CartItemInline,)
+
+
+@admin.register(CartItem)
+class CartItemAdmin(LargeTableAdmin):
+    list_display = ("cart_Item_id", "cart", "product", "quantity", "subtotal")
+    list_select_related = ("cart", "product")
+    raw_id_fields = ("cart", "product")
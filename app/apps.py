@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class AppConfig(AppConfig):
     name = 'app'
+
+    def ready(self):
+        from app import signals  # noqa: F401
+        from app.log import start_queue_listeners
+
+        start_queue_listeners()
@@ -0,0 +1,136 @@
+import threading
+from collections import defaultdict
+
+from django.core.cache import caches
+
+from app.models import Category, Product
+
+CATALOG_CACHE_ALIAS = "catalog"
+EPOCH_KEY = "catalog:epoch"
+
+_MISSING = object()
+
+
+class CacheStats:
+    """Process-local hit/miss counters, keyed by model label."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    def record(self, label, hit):
+        with self._lock:
+            self._counters[label]["hits" if hit else "misses"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {label: dict(counts) for label, counts in self._counters.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def _label(model):
+    return model._meta.model_name
+
+
+def _list_generation_key(model):
+    return f"catalog:{_label(model)}:lists"
+
+
+def _bump(key):
+    cache = get_cache()
+    # add() is a no-op when the key exists, so incr() always has something to work on
+    cache.add(key, 1, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # evicted between add() and incr()
+        cache.set(key, 2, timeout=None)
+        return 2
+
+
+def _generations(model):
+    keys = [EPOCH_KEY, _list_generation_key(model)]
+    values = get_cache().get_many(keys)
+    return values.get(keys[0], 1), values.get(keys[1], 1)
+
+
+def object_key(model, pk, epoch=None):
+    if epoch is None:
+        epoch, _ = _generations(model)
+    return f"catalog:e{epoch}:{_label(model)}:{pk}"
+
+
+def list_key(model, name, generations=None):
+    epoch, lists = generations or _generations(model)
+    return f"catalog:e{epoch}:{_label(model)}:l{lists}:{name}"
+
+
+def cached_object(model, pk, loader, timeout=None):
+    """Read-through lookup of a single object; ``loader(pk)`` returns the object or None."""
+    cache = get_cache()
+    key = object_key(model, pk)
+    value = cache.get(key, _MISSING)
+    stats.record(_label(model), value is not _MISSING)
+    if value is _MISSING:
+        value = loader(pk)
+        # None is cached too so unknown ids do not hit the database on every request
+        cache.set(key, value, timeout=timeout)
+    return value
+
+
+def cached_list(model, name, builder, timeout=None):
+    """Read-through lookup of a list/aggregate computed by ``builder()``."""
+    cache = get_cache()
+    key = list_key(model, name)
+    value = cache.get(key, _MISSING)
+    stats.record(_label(model), value is not _MISSING)
+    if value is _MISSING:
+        value = builder()
+        cache.set(key, value, timeout=timeout)
+    return value
+
+
+def invalidate_object(model, pk):
+    get_cache().delete(object_key(model, pk))
+    invalidate_lists(model)
+
+
+def invalidate_lists(model):
+    _bump(_list_generation_key(model))
+
+
+def invalidate_catalog():
+    """Drop every catalog entry at once, e.g. after bulk writes that bypass model signals."""
+    _bump(EPOCH_KEY)
+
+
+def get_product(pk):
+    return cached_object(Product, pk, lambda key: Product.objects.filter(pk=key).first())
+
+
+def get_category(pk):
+    return cached_object(Category, pk, lambda key: Category.objects.filter(pk=key).first())
+
+
+def get_category_products(category, limit):
+    """
+    Product count and first ``limit`` products of ``category``'s subtree. Stored with the Category
+    lists: product changes bump them too, and a moved category changes the subtree.
+    """
+    def build():
+        products = category.get_subtree_products()
+        return {
+            "count": products.count(),
+            "results": list(products.order_by("product_id").values("product_id", "category_id")[:limit]),
+        }
+    return cached_list(Category, f"products:{category.pk}:{limit}", build)
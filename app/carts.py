@@ -0,0 +1,148 @@
+import uuid
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from app.models import Cart, CartItem
+
+ADD, SET, REMOVE = "add", "set", "remove"
+OPERATIONS = (ADD, SET, REMOVE)
+CENT = Decimal("0.01")
+# unit_price, subtotal and cart_total_amount are numeric(10,2)
+MAX_AMOUNT = Decimal("99999999.99")
+MAX_QUANTITY = 10_000
+
+
+class CartError(ValueError):
+    pass
+
+
+class CartNotFound(CartError):
+    pass
+
+
+def _to_uuid(value):
+    try:
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    except ValueError:
+        raise CartError(f"Invalid product id: {value}")
+
+
+def _to_price(value, product_id):
+    """
+    A finite, non-negative price with at most 2 decimal places, as stored in ``numeric(10,2)``:
+    the delta added to the cart total must equal the sum of the stored subtotals.
+    """
+    try:
+        price = value if isinstance(value, Decimal) else Decimal(str(value))
+        if not price.is_finite() or not 0 <= price <= MAX_AMOUNT or price != price.quantize(CENT):
+            raise ValueError
+        return price.quantize(CENT)
+    except (InvalidOperation, ValueError):
+        raise CartError(f"Invalid unit_price {value!r} for product {product_id}")
+
+
+def apply_changes(cart_id, changes):
+    """
+    Apply a batch of item changes to a cart and return its new total.
+
+    ``changes`` is a list of dicts ``{"op": "add"|"set"|"remove", "product_id", "quantity", "unit_price"}``.
+    The cart row is locked for the whole batch, every item write is batched, and the total is
+    moved by the summed delta with a single ``UPDATE ... SET cart_total_amount = cart_total_amount + delta``
+    instead of re-summing ``cart_items``.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        try:
+            cart = Cart.objects.select_for_update().only("pk", "cart_total_amount").get(pk=cart_id)
+        except Cart.DoesNotExist:
+            raise CartNotFound(f"Cart {cart_id} does not exist")
+
+        changes = [{**change, "product_id": _to_uuid(change.get("product_id"))} for change in changes]
+        product_ids = {change["product_id"] for change in changes}
+        items = {
+            item.product_id: item
+            for item in CartItem.objects.filter(cart_id=cart.pk, product_id__in=product_ids)
+        }
+        created, updated, removed = {}, {}, {}
+        delta = Decimal("0")
+
+        for change in changes:
+            op, product_id = change.get("op", ADD), change["product_id"]
+            if op not in OPERATIONS:
+                raise CartError(f"Unknown cart operation: {op}")
+            item = items.get(product_id)
+
+            if op == REMOVE:
+                if item is not None:
+                    delta -= item.subtotal
+                    del items[product_id]
+                    if not created.pop(product_id, None):
+                        updated.pop(product_id, None)
+                        removed[product_id] = item
+                continue
+
+            try:
+                quantity = int(change["quantity"])
+            except (KeyError, TypeError, ValueError):
+                raise CartError(f"A quantity is required for product {product_id}")
+            minimum = 1 if op == ADD else 0
+            if quantity < minimum:
+                raise CartError(f"Invalid quantity {quantity} for product {product_id}")
+            unit_price = change.get("unit_price")
+            if unit_price is None and item is None:
+                raise CartError(f"unit_price is required to add product {product_id}")
+
+            if item is None:
+                item = CartItem(cart_id=cart.pk, product_id=product_id, quantity=0, subtotal=Decimal("0"), added_at=now)
+                items[product_id] = item
+                created[product_id] = item
+            elif product_id not in created:
+                updated[product_id] = item
+
+            if unit_price is not None:
+                item.unit_price = _to_price(unit_price, product_id)
+            item.quantity = item.quantity + quantity if op == ADD else quantity
+            if item.quantity > MAX_QUANTITY:
+                raise CartError(f"Quantity of product {product_id} cannot exceed {MAX_QUANTITY}")
+            subtotal = item.unit_price * item.quantity
+            if subtotal > MAX_AMOUNT:
+                raise CartError(f"Subtotal of product {product_id} exceeds {MAX_AMOUNT}")
+            delta += subtotal - item.subtotal
+            item.subtotal = subtotal
+
+            if item.quantity == 0:
+                del items[product_id]
+                if not created.pop(product_id, None):
+                    updated.pop(product_id, None)
+                    removed[product_id] = item
+
+        total = cart.cart_total_amount + delta
+        if total > MAX_AMOUNT:
+            raise CartError(f"Cart total cannot exceed {MAX_AMOUNT}")
+
+        if removed:
+            CartItem.objects.filter(pk__in=[item.pk for item in removed.values()]).delete()
+        if created:
+            CartItem.objects.bulk_create(created.values())
+        if updated:
+            CartItem.objects.bulk_update(updated.values(), ["quantity", "unit_price", "subtotal"])
+        Cart.objects.filter(pk=cart.pk).update(
+            cart_total_amount=F("cart_total_amount") + delta,
+            updated_at=now,
+        )
+    return total
+
+
+def add_item(cart_id, product_id, quantity, unit_price):
+    return apply_changes(cart_id, [{"op": ADD, "product_id": product_id, "quantity": quantity, "unit_price": unit_price}])
+
+
+def update_item(cart_id, product_id, quantity, unit_price=None):
+    return apply_changes(cart_id, [{"op": SET, "product_id": product_id, "quantity": quantity, "unit_price": unit_price}])
+
+
+def remove_item(cart_id, product_id):
+    return apply_changes(cart_id, [{"op": REMOVE, "product_id": product_id}])
@@ -0,0 +1,73 @@
+from django.db.models import Count
+
+from app.cache import cached_list, invalidate_lists
+from app.models import Category
+
+
+def rebuild_category_paths():
+    """Recompute path/depth for the whole category table (used after bulk imports, which bypass save())."""
+    rows = list(Category.objects.values_list("pk", "parent_category_id", "path", "depth"))
+    parents = {pk: parent_id for pk, parent_id, _, _ in rows}
+    computed = {}
+
+    def resolve(pk):
+        chain = []
+        node = pk
+        while node is not None and node not in computed:
+            if node in chain:
+                raise ValueError(f"Cycle detected in category tree at category {node}")
+            chain.append(node)
+            node = parents.get(node)
+        prefix, depth = computed[node] if node is not None else ("", -1)
+        for item in reversed(chain):
+            depth += 1
+            prefix += Category.path_segment(item)
+            computed[item] = (prefix, depth)
+        return computed[pk]
+
+    changed = []
+    for pk, _, path, depth in rows:
+        new_path, new_depth = resolve(pk)
+        if (new_path, new_depth) != (path, depth):
+            changed.append(Category(pk=pk, path=new_path, depth=new_depth))
+
+    Category.objects.bulk_update(changed, ["path", "depth"], batch_size=1000)
+    invalidate_category_tree()
+    return len(changed)
+
+
+def build_category_tree():
+    rows = Category.objects.annotate(product_count=Count("products")).order_by("path").values(
+        "pk", "parent_category_id", "product_category_name", "product_category_name_english",
+        "depth", "product_count",
+    )
+    nodes = {}
+    roots = []
+    # ordering by path guarantees that a parent is always seen before its children
+    for row in rows:
+        node = {
+            "id": row["pk"],
+            "name": row["product_category_name"],
+            "name_english": row["product_category_name_english"],
+            "depth": row["depth"],
+            "product_count": row["product_count"],
+            "subtree_product_count": row["product_count"],
+            "children": [],
+        }
+        nodes[row["pk"]] = node
+        parent = nodes.get(row["parent_category_id"])
+        (parent["children"] if parent is not None else roots).append(node)
+
+    # roll the counts up, deepest categories first
+    for node in sorted(nodes.values(), key=lambda n: n["depth"], reverse=True):
+        for child in node["children"]:
+            node["subtree_product_count"] += child["subtree_product_count"]
+    return roots
+
+
+def get_category_tree():
+    return cached_list(Category, "tree", build_category_tree)
+
+
+def invalidate_category_tree():
+    invalidate_lists(Category)
@@ -0,0 +1,130 @@
+import csv
+import io
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from app.models import Order, OrderItem, Payment, Review
+from app.routers import analytics_database
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# dataset -> (model, columns, path to the order purchase timestamp, path to the customer state)
+DATASETS = {
+    "orders": (
+        Order,
+        ("order_id", "customer_id", "order_status", "order_purchase_timestamp", "order_approved_at",
+         "order_delivered_carrier_date", "order_delivered_customer_date", "order_estimated_delivery_date",
+         "customer__customer_state"),
+        "order_purchase_timestamp",
+        "customer__customer_state",
+    ),
+    "order_items": (
+        OrderItem,
+        ("order_item_id", "order_id", "product_id", "seller_id", "order_item_sequence_number",
+         "order_item_price", "order_item_freight_value", "shipping_limit_date"),
+        "order__order_purchase_timestamp",
+        "order__customer__customer_state",
+    ),
+    "payments": (
+        Payment,
+        ("payment_id", "order_id", "payment_type", "payment_sequential", "payment_timestamp",
+         "payment_installments", "payment_value"),
+        "order__order_purchase_timestamp",
+        "order__customer__customer_state",
+    ),
+    "reviews": (
+        Review,
+        ("review_id", "order_id", "review_score", "review_comment_title", "review_comment_message",
+         "review_creation_date", "review_answer_timestamp"),
+        "order__order_purchase_timestamp",
+        "order__customer__customer_state",
+    ),
+}
+
+
+def export_queryset(dataset, start=None, end=None, state=None):
+    model, columns, date_path, state_path = DATASETS[dataset]
+    queryset = model.objects.using(analytics_database()).order_by()
+    if start is not None:
+        queryset = queryset.filter(**{f"{date_path}__gte": start})
+    if end is not None:
+        queryset = queryset.filter(**{f"{date_path}__lt": end})
+    if state:
+        queryset = queryset.filter(**{state_path: state})
+    return queryset.values_list(*columns), columns
+
+
+def header_name(column):
+    return column.rsplit("__", 1)[-1]
+
+
+class CsvEncoder:
+    content_type = "text/csv; charset=utf-8"
+    extension = "csv"
+
+    def __init__(self, columns):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.columns = columns
+
+    def _drain(self):
+        value = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return value
+
+    def header(self):
+        self.writer.writerow([header_name(column) for column in self.columns])
+        return self._drain()
+
+    def encode(self, rows):
+        self.writer.writerows(rows)
+        return self._drain()
+
+
+class NdjsonEncoder:
+    content_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def __init__(self, columns):
+        self.keys = [header_name(column) for column in columns]
+        self.encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def header(self):
+        return ""
+
+    def encode(self, rows):
+        return "".join(self.encoder.encode(dict(zip(self.keys, row))) + "\n" for row in rows)
+
+
+ENCODERS = {"csv": CsvEncoder, "ndjson": NdjsonEncoder}
+
+
+def stream(queryset, encoder, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Server-side cursor -> encoded chunks; memory stays bounded by ``chunk_size`` rows."""
+    header = encoder.header()
+    if header:
+        yield header
+    batch = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield encoder.encode(batch)
+            batch = []
+    if batch:
+        yield encoder.encode(batch)
+
+
+async def astream(queryset, encoder, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Async twin of stream() for ASGI, so the response is not buffered into a list."""
+    header = encoder.header()
+    if header:
+        yield header
+    batch = []
+    async for row in queryset.aiterator(chunk_size=chunk_size):
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield encoder.encode(batch)
+            batch = []
+    if batch:
+        yield encoder.encode(batch)
@@ -0,0 +1,156 @@
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+
+from app.models import Geolocation
+
+ZIP_PREFIX_SPACE = 100_000
+
+
+def as_prefix_codes(prefixes):
+    """Coerce zip prefixes (ints, floats, '01001' strings...) to an int64 array, -1 where invalid."""
+    values = np.asarray(prefixes)
+    if values.dtype.kind in "iu":
+        codes = values.astype(np.int64)
+    elif values.dtype.kind == "f":
+        codes = np.where(np.isfinite(values), values, -1).astype(np.int64)
+    else:
+        codes = np.fromiter(
+            (int(v) if str(v).isdigit() else -1 for v in values.ravel()), dtype=np.int64, count=values.size,
+        ).reshape(values.shape)
+    codes[(codes < 0) | (codes >= ZIP_PREFIX_SPACE)] = -1
+    return codes
+
+
+class ZipGeocoder:
+    """
+    Zip prefix -> lat/lng/city/state lookups over parallel NumPy arrays.
+
+    Rows are sorted by prefix and ``_index`` maps every possible 5-digit prefix straight to its
+    row (or -1), so scalar and batch lookups are a single array indexing operation. Cities are
+    stored once and referenced by an int32 code.
+    """
+
+    def __init__(self, prefixes, lat, lng, states, cities, keys=None):
+        order = np.argsort(prefixes, kind="stable")
+        self.prefixes = np.asarray(prefixes, dtype=np.int32)[order]
+        # primary keys as stored (the CSV import does not always zero-pad them)
+        self.keys = (
+            np.char.zfill(self.prefixes.astype(str), 5) if keys is None
+            else np.asarray(keys, dtype="U5")[order]
+        )
+        self.lat = np.asarray(lat, dtype=np.float64)[order]
+        self.lng = np.asarray(lng, dtype=np.float64)[order]
+        self.states = np.asarray(states, dtype="U2")[order]
+        self.city_names, city_codes = np.unique(np.asarray(cities, dtype=object)[order].astype(str), return_inverse=True)
+        self.city_codes = city_codes.astype(np.int32)
+        self._index = np.full(ZIP_PREFIX_SPACE, -1, dtype=np.int32)
+        self._index[self.prefixes] = np.arange(len(self.prefixes), dtype=np.int32)
+
+    @classmethod
+    def from_database(cls, using=None):
+        queryset = Geolocation.objects.all()
+        if using:
+            queryset = queryset.using(using)
+        rows = list(queryset.order_by().values_list(
+            "geolocation_zip_code_prefix", "geolocation_lat", "geolocation_lng", "geolocation_state", "geolocation_city",
+        ))
+        valid = [row for row in rows if str(row[0]).isdigit()]
+        columns = list(zip(*valid)) or [(), (), (), (), ()]
+        return cls(as_prefix_codes(list(columns[0])), columns[1], columns[2], columns[3], columns[4], keys=columns[0])
+
+    def __len__(self):
+        return len(self.prefixes)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (
+            self.prefixes, self.keys, self.lat, self.lng, self.states, self.city_codes, self._index,
+        )) + sum(len(name) for name in self.city_names)
+
+    def positions(self, prefixes):
+        codes = as_prefix_codes(prefixes)
+        positions = np.full(codes.shape, -1, dtype=np.int32)
+        valid = codes >= 0
+        positions[valid] = self._index[codes[valid]]
+        return positions
+
+    def contains(self, prefixes):
+        return self.positions(prefixes) >= 0
+
+    def zip_codes(self, prefixes):
+        """Geolocation primary keys for known prefixes, None otherwise."""
+        positions = self.positions(prefixes)
+        found = positions >= 0
+        result = np.full(positions.shape, None, dtype=object)
+        result[found] = self.keys[positions[found]]
+        return result
+
+    def geocode(self, prefixes):
+        """Vectorized lookup: dict of parallel arrays, NaN/'' where the prefix is unknown."""
+        positions = self.positions(prefixes)
+        found = positions >= 0
+        rows = positions[found]
+        result = {
+            "found": found,
+            "lat": np.full(positions.shape, np.nan),
+            "lng": np.full(positions.shape, np.nan),
+            "state": np.full(positions.shape, "", dtype="U2"),
+            "city": np.full(positions.shape, "", dtype=object),
+        }
+        result["lat"][found] = self.lat[rows]
+        result["lng"][found] = self.lng[rows]
+        result["state"][found] = self.states[rows]
+        result["city"][found] = self.city_names[self.city_codes[rows]]
+        return result
+
+    def lookup(self, prefix):
+        position = int(self.positions([prefix])[0])
+        if position < 0:
+            return None
+        return {
+            "zip_code_prefix": str(self.keys[position]),
+            "lat": float(self.lat[position]),
+            "lng": float(self.lng[position]),
+            "city": str(self.city_names[self.city_codes[position]]),
+            "state": str(self.states[position]),
+        }
+
+
+_lock = threading.Lock()
+_geocoder = None
+_signature = None
+_checked_at = None
+
+
+def _table_signature():
+    return tuple(Geolocation.objects.aggregate(count=Count("pk"), last_update=Max("updated_at")).values())
+
+
+def get_geocoder():
+    """
+    Process-wide geocoder. The table signature (row count, last updated_at) is checked at most
+    every GEOCODER_CHECK_INTERVAL seconds and the arrays are rebuilt only when it changed.
+    """
+    global _geocoder, _signature, _checked_at
+    interval = getattr(settings, "GEOCODER_CHECK_INTERVAL", 60)
+    with _lock:
+        now = time.monotonic()
+        if _geocoder is not None and _checked_at is not None and now - _checked_at < interval:
+            return _geocoder
+        signature = _table_signature()
+        if _geocoder is None or signature != _signature:
+            _geocoder = ZipGeocoder.from_database()
+            _signature = signature
+        _checked_at = now
+        return _geocoder
+
+
+def invalidate_geocoder():
+    """Force a signature check on the next get_geocoder() call."""
+    global _checked_at
+    with _lock:
+        _checked_at = None
@@ -0,0 +1,238 @@
+import datetime
+import json
+import posixpath
+import uuid
+from collections import Counter, OrderedDict
+from urllib.parse import urlparse
+
+from django.contrib.gis.db.models import GeometryField
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+from django.utils.dateparse import parse_datetime
+
+from app.models import Cart, CartItem, Category, Customer, Geolocation, Order, OrderItem, Payment, Product, Review, Seller
+
+STATE_FILE = "_export_state.json"
+NULL_PARTITION = "__null__"
+
+# table -> (model, partition column, incremental watermark column)
+# Watermarks are last-modification columns (auto_now or set by app.carts), so updated rows are
+# exported again. Limits of incremental runs: rows whose watermark is NULL, rows changed through
+# QuerySet.update()/bulk_update() (auto_now is not applied) and rows committed after the run
+# with an older timestamp are only picked up by a full export.
+EXPORTS = {
+    "geolocation": (Geolocation, "created_at", "updated_at"),
+    "category": (Category, "created_at", "updated_at"),
+    "product": (Product, "created_at", "updated_at"),
+    "customer": (Customer, "created_at", "updated_at"),
+    "seller": (Seller, "created_at", "updated_at"),
+    "order": (Order, "order_purchase_timestamp", "updated_at"),
+    "order_item": (OrderItem, "shipping_limit_date", "updated_at"),
+    "payment": (Payment, "payment_timestamp", "updated_at"),
+    "review": (Review, "review_creation_date", "updated_at"),
+    "cart": (Cart, "created_at", "updated_at"),
+    "cart_item": (CartItem, "added_at", "added_at"),
+}
+DEFAULT_MAX_OPEN_WRITERS = 16
+
+
+def export_fields(model):
+    """Concrete columns that make sense in the lake (geometry and tsvector columns are skipped)."""
+    return [
+        field for field in model._meta.concrete_fields
+        if not isinstance(field.output_field if field.generated else field, (GeometryField, SearchVectorField))
+    ]
+
+
+def arrow_type(field):
+    import pyarrow as pa
+
+    if field.is_relation:
+        field = field.target_field
+    if isinstance(field, models.UUIDField):
+        return pa.string()
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, (models.BigIntegerField, models.PositiveBigIntegerField)):
+        return pa.int64()
+    if isinstance(field, models.IntegerField):
+        # AutoField, SmallIntegerField and the Positive* variants all subclass IntegerField
+        return pa.int64()
+    return pa.string()
+
+
+def arrow_schema(fields):
+    import pyarrow as pa
+
+    return pa.schema([pa.field(field.attname, arrow_type(field)) for field in fields])
+
+
+def _convert(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def partition_value(value):
+    if value is None:
+        return NULL_PARTITION
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+class LakeTarget:
+    """Local directory or s3://bucket/prefix (S3-compatible endpoints such as MinIO via endpoint_url)."""
+
+    def __init__(self, uri, endpoint_url=None):
+        from pyarrow import fs
+
+        parsed = urlparse(uri)
+        if parsed.scheme == "s3":
+            self.filesystem = fs.S3FileSystem(endpoint_override=endpoint_url) if endpoint_url else fs.S3FileSystem()
+            self.root = f"{parsed.netloc}{parsed.path}".rstrip("/")
+        else:
+            self.filesystem = fs.LocalFileSystem()
+            self.root = str(uri).rstrip("/")
+
+    def path(self, *parts):
+        return posixpath.join(self.root, *parts)
+
+    def open_writer(self, path, schema):
+        import pyarrow.parquet as pq
+
+        self.filesystem.create_dir(posixpath.dirname(path), recursive=True)
+        return pq.ParquetWriter(path, schema, filesystem=self.filesystem, compression="snappy")
+
+    def read_state(self):
+        from pyarrow import fs
+
+        path = self.path(STATE_FILE)
+        if self.filesystem.get_file_info(path).type == fs.FileType.NotFound:
+            return {}
+        with self.filesystem.open_input_stream(path) as stream:
+            return json.loads(stream.read())
+
+    def write_state(self, state):
+        self.filesystem.create_dir(self.root, recursive=True)
+        with self.filesystem.open_output_stream(self.path(STATE_FILE)) as stream:
+            stream.write(json.dumps(state, indent=2, sort_keys=True).encode())
+
+
+class PartitionWriters:
+    """
+    Parquet writers keyed by partition, at most ``max_open`` open at a time (least recently used
+    is closed first). Rows arrive unordered, so a partition whose writer was closed gets another
+    ``part-<run_id>-<n>.parquet`` file. At most ``chunk_size`` rows are buffered in total.
+    """
+
+    def __init__(self, target, table, run_id, schema, columns, chunk_size, max_open):
+        self.target, self.table, self.run_id = target, table, run_id
+        self.schema, self.columns = schema, columns
+        self.chunk_size, self.max_open = chunk_size, max_open
+        self.open = OrderedDict()  # partition -> (writer, pending rows)
+        self.files = Counter()
+        self.buffered = 0
+
+    def add(self, partition, row):
+        entry = self.open.get(partition)
+        if entry is None:
+            if len(self.open) >= self.max_open:
+                self._close(next(iter(self.open)))
+            number = self.files[partition]
+            self.files[partition] += 1
+            name = f"part-{self.run_id}-{number}.parquet" if number else f"part-{self.run_id}.parquet"
+            entry = self.open[partition] = (
+                self.target.open_writer(self.target.path(self.table, f"dt={partition}", name), self.schema), [],
+            )
+        else:
+            self.open.move_to_end(partition)
+        entry[1].append(row)
+        self.buffered += 1
+        if self.buffered >= self.chunk_size:
+            for open_partition in self.open:
+                self._flush(open_partition)
+
+    def _flush(self, partition):
+        import pyarrow as pa
+
+        writer, pending = self.open[partition]
+        if pending:
+            writer.write_table(pa.Table.from_pylist([dict(zip(self.columns, row)) for row in pending], schema=self.schema))
+            self.buffered -= len(pending)
+            pending.clear()
+
+    def _close(self, partition):
+        self._flush(partition)
+        self.open.pop(partition)[0].close()
+
+    def close(self):
+        for partition in list(self.open):
+            self._close(partition)
+
+
+def _state_entry(since):
+    """State values are {"watermark": iso, "pks": [...]}; older states stored the bare timestamp."""
+    if since is None:
+        return None, []
+    if isinstance(since, dict):
+        return parse_datetime(since["watermark"]), since.get("pks", [])
+    if isinstance(since, str):
+        return parse_datetime(since), []
+    return since, []
+
+
+def export_table(target, table, run_id, chunk_size=10_000, since=None, using="default",
+                 max_open_writers=DEFAULT_MAX_OPEN_WRITERS):
+    """
+    Stream one table into ``<table>/dt=YYYY-MM-DD/part-<run_id>[-n].parquet`` files.
+
+    Rows come from an unordered server-side cursor (no sort on the unindexed partition
+    columns before the first row streams), at most ``chunk_size`` rows are held in memory.
+    ``since`` is the state entry of the previous run: rows whose watermark is >= its timestamp
+    are exported, except those already exported at exactly that timestamp.
+    Returns ``(rows_written, state_entry)``.
+    """
+    model, partition_column, watermark_column = EXPORTS[table]
+    fields = export_fields(model)
+    columns = [field.attname for field in fields]
+    partition_index = columns.index(partition_column)
+    watermark_index = columns.index(watermark_column)
+    pk_index = columns.index(model._meta.pk.attname)
+
+    since, seen = _state_entry(since)
+    queryset = model.objects.using(using).order_by()
+    if since is not None:
+        queryset = queryset.filter(**{f"{watermark_column}__gte": since})
+        if seen:
+            queryset = queryset.exclude(**{watermark_column: since, "pk__in": seen})
+    rows = queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+
+    writers = PartitionWriters(target, table, run_id, arrow_schema(fields), columns, chunk_size, max_open_writers)
+    written, watermark = 0, since
+    # pks sharing the high watermark: the next run starts at >= watermark and skips them
+    at_watermark = list(seen)
+    try:
+        for row in rows:
+            writers.add(partition_value(row[partition_index]), tuple(_convert(value) for value in row))
+            written += 1
+            value = row[watermark_index]
+            if value is None:
+                continue
+            if watermark is None or value > watermark:
+                watermark, at_watermark = value, [str(row[pk_index])]
+            elif value == watermark:
+                at_watermark.append(str(row[pk_index]))
+    finally:
+        writers.close()
+    if watermark is None:
+        return written, None
+    return written, {"watermark": watermark.isoformat(), "pks": at_watermark}
@@ -0,0 +1,89 @@
+import atexit
+import json
+import logging
+import os
+import queue
+from datetime import datetime, timezone
+
+# attributes every LogRecord has; anything else was passed through ``extra=``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and any ``extra`` fields."""
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+# (QueueHandler, QueueListener) pairs started by start_queue_listeners
+_started = []
+
+
+def start_queue_listeners():
+    """Start the listener threads of the QueueHandlers declared in LOGGING (dictConfig leaves them stopped)."""
+    for handler in logging.getLogger().handlers:
+        listener = getattr(handler, "listener", None)
+        if listener is not None and getattr(listener, "_thread", None) is None:
+            listener.start()
+            # flush what is still queued when the process exits
+            atexit.register(listener.stop)
+            if not _started and hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=_restart_queue_listeners)
+            _started.append((handler, listener))
+
+
+def _restart_queue_listeners():
+    """
+    Forked children (gunicorn --preload, multiprocessing "fork") only keep the thread that called
+    fork(): the copied listener threads are dead and records would pile up in the queues.
+    """
+    for handler, listener in _started:
+        if isinstance(listener.queue, queue.Queue):
+            # the parent's queue lock may have been held at fork time, and its pending records are
+            # written by the parent
+            handler.queue = listener.queue = queue.Queue(listener.queue.maxsize)
+        listener._thread = None
+        listener.start()
+
+
+class RowErrorAggregator:
+    """
+    Collect per-row import errors and log one structured record per (table, error type)
+    instead of one line per bad row.
+    """
+
+    def __init__(self, logger, sample_size=10):
+        self.logger = logger
+        self.sample_size = sample_size
+        self.errors = {}
+
+    def add(self, table, row_id, exc):
+        key = (table, type(exc).__name__)
+        entry = self.errors.get(key)
+        if entry is None:
+            entry = self.errors[key] = {"count": 0, "sample_row_ids": [], "sample_message": str(exc)}
+        entry["count"] += 1
+        if len(entry["sample_row_ids"]) < self.sample_size:
+            entry["sample_row_ids"].append(str(row_id))
+
+    def flush(self):
+        for (table, error), entry in self.errors.items():
+            self.logger.error(
+                f"{entry['count']} {table} rows skipped ({error}: {entry['sample_message']})",
+                extra={"event": "import_row_errors", "table": table, "error": error, **entry},
+            )
+        self.errors.clear()
@@ -1,14 +1,49 @@
-import pandas as pd
+import datetime
+import functools
+import uuid
+
 from django.core.management.base import BaseCommand
 from django.db import transaction
 import logging
-from tqdm import tqdm
 
 from app.models import Geolocation, Customer, Order, OrderItem, Product, Category,Seller,Payment,Review,CartItem,Cart
-from faker import Faker
 
+from app.cache import invalidate_catalog
+from app.categories import rebuild_category_paths
+from app.log import RowErrorAggregator
+from app.timeseries import refresh_buckets
 from utils import *
-fake = Faker()
+
+# pandas, tqdm, Faker and NumPy (through the geocoder) are imported on first use: Django imports
+# command modules for --help and shell completion, which should not pay for them.
+
+
+def read_csv(path):
+    import pandas as pd
+
+    return pd.read_csv(path)
+
+
+def progress(iterable, **kwargs):
+    from tqdm import tqdm
+
+    return tqdm(iterable, **kwargs)
+
+
+def as_uuid(value):
+    """CSV id (Olist hex or dashed form) -> UUID, the key type of the lookup dicts; None if malformed."""
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+@functools.cache
+def get_faker():
+    from faker import Faker
+
+    return Faker()
+
 
 logger = logging.getLogger(__name__)
 
@@ -72,10 +107,15 @@ class Command(BaseCommand):
     @transaction.atomic
     def handle(self, *args, **options):
         logger.info("🚀 Starting Olist import...")
+        # bad rows are counted in memory and logged once per table/error type
+        self.errors = RowErrorAggregator(logger)
+        # purchase-time span of the orders touched by this run, for the time-series refresh
+        self.touched = None
         try:
             self.stdout.write(self.style.WARNING("🚀 Starting Olist import..."))
             self.import_geolocations(options['geolocations'])
             self.import_categories(options['category'])
+            rebuild_category_paths()
             self.import_products(options['products'])
             self.import_customers(options['customers'])
             self.import_sellers(options['seller'])
@@ -83,18 +123,35 @@ class Command(BaseCommand):
             self.import_order_items(options['order_items'])
             self.import_payments(options['payment'])
             self.review_import(options['review'])
+            if self.touched is not None:
+                # only the buckets overlapping the imported orders are recomputed
+                written = refresh_buckets(self.touched[0], self.touched[1] + datetime.timedelta(microseconds=1))
+                self.stdout.write(self.style.SUCCESS(f"📈 Time series buckets refreshed: {written}"))
+            # bulk_create does not send post_save, so the catalog cache is dropped explicitly
+            transaction.on_commit(invalidate_catalog)
 
         except Exception as e:
             logger.error(f"❌ IMPORT FAILED: {e}")
             raise
+        finally:
+            self.errors.flush()
 
         logger.info("🎉 Import completed successfully!")
 
+    def touch(self, timestamps):
+        timestamps = [ts for ts in timestamps if ts is not None]
+        if not timestamps:
+            return
+        low, high = min(timestamps), max(timestamps)
+        if self.touched is not None:
+            low, high = min(low, self.touched[0]), max(high, self.touched[1])
+        self.touched = (low, high)
+
     def import_geolocations(self, path):
-            df = pd.read_csv(path)
+            df = read_csv(path)
             ligne_csv = df.shape[0]
             objs = []
-            for row in tqdm(df.itertuples(), total=ligne_csv, desc="Importing Geolocations"):
+            for row in progress(df.itertuples(), total=ligne_csv, desc="Importing Geolocations"):
                 try:
                     objs.append(Geolocation(
                         geolocation_zip_code_prefix=row.geolocation_zip_code_prefix,
@@ -104,37 +161,40 @@ class Command(BaseCommand):
                         geolocation_state=row.geolocation_state
                     ))
                 except Exception as e:
-                    logger.error(f"Error importing geolocation {row.geolocation_zip_code_prefix}: {e}")
+                    self.errors.add("geolocation", row.geolocation_zip_code_prefix, e)
                     continue
 
             Geolocation.objects.bulk_create(objs, ignore_conflicts=True)
+            from app.geocoder import invalidate_geocoder
+
+            invalidate_geocoder()
             self.stdout.write(self.style.SUCCESS(f"📍 Geolocations imported: {len(objs)}/{ligne_csv}"))
 
 
     def import_categories(self, path):
-        df = pd.read_csv(path)
+        df = read_csv(path)
         ligne_csv = df.shape[0]
         objs = []
-        for row in tqdm( df.itertuples(), total=ligne_csv, desc="Importing Categories"):
+        for row in progress(df.itertuples(), total=ligne_csv, desc="Importing Categories"):
             try:
                 objs.append(Category(
                     product_category_name=row.product_category_name,
                     product_category_name_english=row.product_category_name_english,
                 ))
             except Exception as e:
-                logger.error(f"Error importing category {row.product_category_name}: {e}")
+                self.errors.add("category", row.product_category_name, e)
                 continue
         Category.objects.bulk_create(objs, ignore_conflicts=True)
         self.stdout.write(self.style.SUCCESS(f"📂 Categories imported: {len(objs)}/{ligne_csv}"))
 
 
     def import_products(self, path):
-        df = pd.read_csv(path)
+        df = read_csv(path)
         ligne_csv = df.shape[0]
         categories = {c.product_category_name: c for c in Category.objects.all()}
 
         objs = []
-        for row in tqdm( df.itertuples(), total=ligne_csv, desc="Importing Products"):
+        for row in progress(df.itertuples(), total=ligne_csv, desc="Importing Products"):
             try:
                 category = categories.get(row.product_category_name)
                 objs.append(Product(
@@ -149,26 +209,29 @@ class Command(BaseCommand):
                     product_width_cm=row.product_width_cm,
                 ))
             except Exception as e:
-                logger.error(f"Error importing product {row.product_id}: {e}")
+                self.errors.add("product", row.product_id, e)
                 continue
         Product.objects.bulk_create(objs, ignore_conflicts=True)
         self.stdout.write(self.style.SUCCESS(f"📦 Products imported: {len(objs)}/{ligne_csv}"))
 
 
     def import_customers(self, path):
-        df = pd.read_csv(path)
+        df = read_csv(path)
         ligne_csv = df.shape[0]
-        geos = {g.geolocation_zip_code_prefix: g for g in Geolocation.objects.all()}
+        from app.geocoder import get_geocoder
+
+        # Geolocation keys for the whole column at once, None for unknown prefixes
+        zip_codes = get_geocoder().zip_codes(df["customer_zip_code_prefix"].to_numpy())
+        fake = get_faker()
 
         objs = []
-        for row in tqdm( df.itertuples(), total=ligne_csv, desc="Importing Customers"):
+        for row, zip_code in progress(zip(df.itertuples(), zip_codes), total=ligne_csv, desc="Importing Customers"):
             try:
-                geo = geos.get(str(row.customer_zip_code_prefix).zfill(5))
                 objs.append(Customer(
                     customer_id=row.customer_id,
                     customer_first_name=row.customer_first_name,
                     customer_last_name=row.customer_last_name,
-                    customer_zip_code_prefix=geo,
+                    customer_zip_code_prefix_id=zip_code,
                     customer_city=row.customer_city,
                     customer_state=row.customer_state,
                     customer_address=row.address,
@@ -176,25 +239,28 @@ class Command(BaseCommand):
                     customer_phone_number=fake.phone_number(),
                 ))
             except Exception as e:
-                logger.error(f"Error importing customer {row.customer_id}: {e}")
+                self.errors.add("customer", row.customer_id, e)
                 continue
         Customer.objects.bulk_create(objs, ignore_conflicts=True)
         self.stdout.write(self.style.SUCCESS(f"👤 Customers imported: {len(objs)}/{ligne_csv}"))
 
 
     def import_sellers(self, path):
-        df = pd.read_csv(path)
+        df = read_csv(path)
         ligne_csv = df.shape[0]
-        geos = {g.geolocation_zip_code_prefix: g for g in Geolocation.objects.all()}
+        from app.geocoder import get_geocoder
+
+        # Geolocation keys for the whole column at once, None for unknown prefixes
+        zip_codes = get_geocoder().zip_codes(df["seller_zip_code_prefix"].to_numpy())
+        fake = get_faker()
 
         objs = []
-        for row in tqdm( df.itertuples(), total=ligne_csv, desc="Importing Sellers"):
+        for row, zip_code in progress(zip(df.itertuples(), zip_codes), total=ligne_csv, desc="Importing Sellers"):
             try:
-                geo = geos.get(str(row.seller_zip_code_prefix).zfill(5))
                 objs.append(Seller(
                     seller_id=row.seller_id,
                     seller_first_name=row.seller_first_name,
-                    seller_zip_code_prefix=geo,
+                    seller_zip_code_prefix_id=zip_code,
                     seller_last_name=row.seller_last_name,
                     seller_phone_number=fake.phone_number(),
                     seller_city=row.seller_city,
@@ -203,21 +269,21 @@ class Command(BaseCommand):
                     seller_address=row.seller_address
                 ))
             except Exception as e:
-                logger.error(f"Error importing seller {row.seller_id}: {e}")
+                self.errors.add("seller", row.seller_id, e)
                 continue
         Seller.objects.bulk_create(objs, ignore_conflicts=True)
         self.stdout.write(self.style.SUCCESS(f"🏪 Sellers imported: {len(objs)}/{ligne_csv}"))
 
 
     def import_orders(self, path):
-        df = pd.read_csv(path)
+        df = read_csv(path)
         ligne_csv = df.shape[0]
         customers = {c.customer_id: c for c in Customer.objects.all()}
 
         objs = []
-        for row in tqdm( df.itertuples(), total=ligne_csv, desc="Importing Orders"):
+        for row in progress(df.itertuples(), total=ligne_csv, desc="Importing Orders"):
             try:
-                customer = customers.get(row.customer_id)
+                customer = customers.get(as_uuid(row.customer_id))
                 objs.append(Order(
                     order_id=row.order_id,
                     customer=customer,
@@ -229,73 +295,83 @@ class Command(BaseCommand):
                     order_estimated_delivery_date=row.order_estimated_delivery_date,
                 ))
             except Exception as e:
-                logger.error(f"Error importing order {row.order_id}: {e}")
+                self.errors.add("order", row.order_id, e)
                 continue
 
         Order.objects.bulk_create(objs, ignore_conflicts=True)
+        import pandas as pd
+
+        purchased = pd.to_datetime(df["order_purchase_timestamp"], errors="coerce", utc=True).dropna()
+        if not purchased.empty:
+            self.touch([purchased.min().to_pydatetime(), purchased.max().to_pydatetime()])
         logger.info(f"Orders imported: {len(objs)}/{ligne_csv}")
 
 
 
 
     def import_order_items(self, path):
-        df = pd.read_csv(path)
+        df = read_csv(path)
         ligne_csv = df.shape[0]
         orders = {o.order_id: o for o in Order.objects.all()}
         products = {p.product_id: p for p in Product.objects.all()}
         sellers = {s.seller_id: s for s in Seller.objects.all()}
 
         objs = []
-        for row in tqdm(df.itertuples(),total=ligne_csv,desc="Importing Order Items"):
+        for row in progress(df.itertuples(),total=ligne_csv,desc="Importing Order Items"):
             try:
                 objs.append(OrderItem(
-                    order=orders.get(row.order_id),
-                    product=products.get(row.product_id),
-                    seller=sellers.get(row.seller_id),
+                    order=orders.get(as_uuid(row.order_id)),
+                    product=products.get(as_uuid(row.product_id)),
+                    seller=sellers.get(as_uuid(row.seller_id)),
                     order_item_sequence_number=row.order_item_id,
                     order_item_price=row.price,
                     order_item_freight_value=row.freight_value,
                     shipping_limit_date=row.shipping_limit_date
                 ))
             except Exception as e:
-                logger.error(f"Error importing order item for order {row.order_id}: {e}")
+                self.errors.add("order_item", row.order_id, e)
                 continue
         OrderItem.objects.bulk_create(objs, ignore_conflicts=True)
+        self.touch(item.order.order_purchase_timestamp for item in objs if item.order is not None)
         self.stdout.write(self.style.SUCCESS(f"📦 Order Items imported: {len(objs)}/{ligne_csv}"))
 
 
 
     def import_payments(self, path):
-        df = pd.read_csv(path)
+        df = read_csv(path)
         ligne_csv = df.shape[0]
         orders = {o.order_id: o for o in Order.objects.all()}
 
         objs = []
         for row in df.itertuples():
             try:
+                order = orders.get(as_uuid(row.order_id))
                 objs.append(Payment(
-                    order=orders.get(row.order_id),
+                    order=order,
+                    # the Olist payments file has no timestamp of its own
+                    payment_timestamp=order.order_purchase_timestamp if order else None,
                     payment_sequential=row.payment_sequential,
                     payment_type=row.payment_type,
                     payment_installments=row.payment_installments,
                     payment_value=row.payment_value,
                 ))
             except Exception as e:
-                logger.error(f"Error importing payment for order {row.order_id}: {e}")
+                self.errors.add("payment", row.order_id, e)
                 continue
         Payment.objects.bulk_create(objs, ignore_conflicts=True)
+        self.touch(payment.order.order_purchase_timestamp for payment in objs if payment.order is not None)
         self.stdout.write(self.style.SUCCESS(f" 💳 Payments imported: {len(objs)}/{ligne_csv}"))
 
 
     def review_import(self, path):
-        df = pd.read_csv(path)
+        df = read_csv(path)
         ligne_csv = df.shape[0]
         orders = {o.order_id: o for o in Order.objects.all()}
         objs =[]
         for row in df.itertuples():
             try:
                 objs.append(Review(
-                    order=orders.get(row.order_id),
+                    order=orders.get(as_uuid(row.order_id)),
                     review_id=row.review_id,
                     review_score=row.review_score,
                     review_comment_title=row.review_comment_title,
@@ -304,7 +380,7 @@ class Command(BaseCommand):
                     review_answer_timestamp=row.review_answer_timestamp
                 ))
             except Exception as e:
-                logger.error(f"Error importing review for order {row.order_id}: {e}")
+                self.errors.add("review", row.order_id, e)
                 continue
         Review.objects.bulk_create(objs, ignore_conflicts=True)
         self.stdout.write(self.style.SUCCESS(f"⭐ Reviews imported: {len(objs)}/{ligne_csv}"))
\ No newline at end of file
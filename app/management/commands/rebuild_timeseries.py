@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from app.timeseries import GRANULARITIES, refresh_buckets, to_utc
+
+
+class Command(BaseCommand):
+    help = "Recompute the pre-bucketed order/revenue time series (whole history or a date range)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=str,
+                            default=None,
+                            help='ISO datetime; defaults to the first order')
+
+        parser.add_argument('--end', type=str,
+                            default=None,
+                            help='ISO datetime (exclusive); defaults to the last order')
+
+        parser.add_argument('--granularities', nargs='+',
+                            choices=GRANULARITIES,
+                            default=list(GRANULARITIES),
+                            help='Granularities to rebuild (default: all)')
+
+    def handle(self, *args, **options):
+        bounds = {}
+        for name in ('start', 'end'):
+            if options[name]:
+                bounds[name] = parse_datetime(options[name]) or parse_datetime(f"{options[name]}T00:00:00")
+                if bounds[name] is None:
+                    raise CommandError(f"--{name} must be an ISO date or datetime")
+                bounds[name] = to_utc(bounds[name])
+        if len(bounds) == 2 and bounds['start'] >= bounds['end']:
+            raise CommandError("--start must be before --end")
+        written = refresh_buckets(granularities=options['granularities'], **bounds)
+        self.stdout.write(self.style.SUCCESS(f"📈 Time series buckets written: {written}"))
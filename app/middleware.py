@@ -0,0 +1,131 @@
+import logging
+import random
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from app import profiling, routers
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_PIN_COOKIE = "db_primary_pin"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+UNRESOLVED_VIEW = "<unresolved>"
+
+
+class ReplicaPinningMiddleware:
+    """
+    Scope database routing state to the request.
+
+    Unsafe methods are served entirely from the primary. When a request writes, a short-lived
+    cookie pins the client's following requests to the primary as well, so it reads its own
+    writes while the replicas catch up.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _start(request):
+        return routers.start_request(
+            pinned=request.method not in SAFE_METHODS or PRIMARY_PIN_COOKIE in request.COOKIES,
+        )
+
+    @staticmethod
+    def _pin(response):
+        if routers.wrote_to_primary():
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, "1",
+                max_age=getattr(settings, "REPLICA_PIN_SECONDS", 10),
+                httponly=True, samesite="Lax",
+            )
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = self._start(request)
+        try:
+            return self._pin(self.get_response(request))
+        finally:
+            routers.end_request(token)
+
+    async def __acall__(self, request):
+        token = self._start(request)
+        try:
+            return self._pin(await self.get_response(request))
+        finally:
+            routers.end_request(token)
+
+
+class QueryProfilingMiddleware:
+    """
+    Record query count, DB time and repeated statement fingerprints for a sample of requests.
+
+    QUERY_PROFILING_SAMPLE_RATE (0..1) keeps the cost near zero in production; profiled
+    requests are aggregated per view in ``profiling.stats`` and logged every
+    QUERY_PROFILING_EXPORT_EVERY profiled requests.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.sample_rate = getattr(settings, "QUERY_PROFILING_SAMPLE_RATE", 0.0)
+        self.threshold = getattr(settings, "QUERY_PROFILING_N_PLUS_ONE_THRESHOLD", profiling.DEFAULT_N_PLUS_ONE_THRESHOLD)
+        self.export_every = getattr(settings, "QUERY_PROFILING_EXPORT_EVERY", 1000)
+        self.profiled = 0
+
+    def _sampled(self):
+        return self.sample_rate and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+        with profiling.record_queries() as recorder:
+            response = self.get_response(request)
+        return self._report(request, response, recorder)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+        # connections are per thread and the ORM runs in the request's thread-sensitive
+        # sync_to_async thread, so the wrappers must be installed (and removed) there
+        stack = ExitStack()
+        recorder = await sync_to_async(stack.enter_context)(profiling.record_queries())
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self._report(request, response, recorder)
+
+    def _report(self, request, response, recorder):
+        match = request.resolver_match
+        # one shared key for 404s: keying by path would grow without bound under scanners
+        view = match.view_name if match else UNRESOLVED_VIEW
+        repeated = recorder.repeated(self.threshold)
+        for sql, count in repeated.items():
+            logger.warning(f"Possible N+1 in {view}: {count}x {sql}")
+        profiling.stats.add(view, recorder, repeated)
+
+        if settings.DEBUG:
+            response["X-Query-Count"] = str(recorder.count)
+            response["X-DB-Time-ms"] = f"{recorder.duration * 1000:.1f}"
+
+        self.profiled += 1
+        if self.export_every and self.profiled % self.export_every == 0:
+            logger.info("Query profile", extra={"query_profile": profiling.stats.snapshot()})
+        return response
@@ -1,9 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.conf import settings
 import uuid
 from django.contrib.gis.db.models import PointField
 from django.contrib.gis.geos import Point
-from django.contrib.postgres.search import SearchVectorField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 
 
 # Create your models here.
@@ -52,6 +55,9 @@ class Geolocation(models.Model):
     class Meta:
         db_table = "geolocation"
         ordering = ["geolocation_zip_code_prefix"]
+        indexes = [
+            models.Index(fields=["geolocation_state"], name="geolocation_state_idx"),
+        ]
 
 
 
@@ -80,6 +86,9 @@ class Customer(models.Model):
     class Meta:
         db_table = "customer"
         verbose_name_plural = "Customers"
+        indexes = [
+            models.Index(fields=["customer_state"], name="customer_state_idx"),
+        ]
 
 
 class Seller(models.Model):
@@ -105,6 +114,9 @@ class Seller(models.Model):
     class Meta:
         db_table = "seller"
         verbose_name_plural = "Sellers"
+        indexes = [
+            models.Index(fields=["seller_state"], name="seller_state_idx"),
+        ]
 
 
 
@@ -119,14 +131,66 @@ class Category(models.Model):
     parent_category = models.ForeignKey(
         'self', on_delete=models.CASCADE, null=True, blank=True, related_name='subcategories'
     )
+    path = models.CharField(
+        max_length=255, default="", editable=False,
+        db_comment="Materialized path of the category in the tree (zero-padded ancestor ids, '/' separated)"
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, db_comment="Depth of the category in the tree (0 for roots)")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    PATH_STEP = 8
+
+    def __str__(self):
+        return self.product_category_name
+
+    @classmethod
+    def path_segment(cls, pk):
+        return str(pk).zfill(cls.PATH_STEP) + "/"
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.move_subtree()
+
+    def move_subtree(self):
+        """Recompute the path of this category and re-root its descendants in one UPDATE."""
+        old_path, old_depth = Category.objects.filter(pk=self.pk).values_list("path", "depth").get()
+        if self.parent_category_id is not None:
+            parent_path, parent_depth = Category.objects.filter(
+                pk=self.parent_category_id
+            ).values_list("path", "depth").get()
+            if old_path and parent_path.startswith(old_path):
+                raise ValueError(f"Category {self.pk} cannot be moved under its own subcategory {self.parent_category_id}")
+            new_path, new_depth = parent_path + self.path_segment(self.pk), parent_depth + 1
+        else:
+            new_path, new_depth = self.path_segment(self.pk), 0
+
+        self.path, self.depth = new_path, new_depth
+        if new_path == old_path and new_depth == old_depth:
+            return
+        Category.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+        if old_path:
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(new_path), Substr("path", len(old_path) + 1)),
+                depth=F("depth") + (new_depth - old_depth),
+            )
+
+    def get_descendants(self, include_self=True):
+        qs = Category.objects.filter(path__startswith=self.path)
+        return qs if include_self else qs.exclude(pk=self.pk)
+
+    def get_subtree_products(self):
+        return Product.objects.filter(category__path__startswith=self.path)
+
 
     class Meta:
         verbose_name_plural = "Categories"
         db_table = "category"
         ordering = ['product_category_name']
+        indexes = [
+            models.Index(fields=["path"], name="category_path_idx", opclasses=["varchar_pattern_ops"]),
+        ]
 
 
 
@@ -174,11 +238,16 @@ class Order(models.Model):
     order_delivered_carrier_date = models.DateTimeField(null=True, blank=True, db_comment="Shows the order posting timestamp. When it was handled to the logistic partner.")
     order_delivered_customer_date = models.DateTimeField(null=True, blank=True, db_comment="Shows the order delivery timestamp. When it was delivered to the customer.")
     order_estimated_delivery_date = models.DateTimeField(null=True, blank=True, db_comment="Shows the estimated delivery date that was informed to customer at the purchase moment.")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "order"
         ordering = ['order_purchase_timestamp']
         verbose_name_plural = "Orders"
+        indexes = [
+            models.Index(fields=["order_purchase_timestamp", "order_id"], name="order_purchase_keyset_idx"),
+            models.Index(fields=["order_status"], name="order_status_idx"),
+        ]
 
 
 class OrderItem(models.Model):
@@ -195,6 +264,7 @@ class OrderItem(models.Model):
     order_item_price = models.DecimalField(max_digits=10, decimal_places=2, db_comment="Price of the item ordered")
     order_item_freight_value = models.DecimalField(max_digits=10, decimal_places=2, db_comment="item freight value item( if an order has more than one item the freight value is splitted between items)")
     shipping_limit_date= models.DateTimeField(null=True, blank=True, db_comment="Shows the seller shipping limit date for handling the order over to the logistic partner.")
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 
@@ -217,10 +287,14 @@ class Payment(models.Model):
     payment_timestamp = models.DateTimeField(db_comment="Timestamp when the payment was made")
     payment_installments= models.IntegerField(null=True, blank=True, db_comment="Number of installments chosen by the customer")
     payment_value= models.DecimalField(max_digits=10, decimal_places=2, db_comment="transaction value")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "payment"
         verbose_name_plural = "Payments"
+        indexes = [
+            models.Index(fields=["payment_type"], name="payment_type_idx"),
+        ]
 
 
 
@@ -238,9 +312,28 @@ class Review(models.Model):
     review_comment_message = models.TextField(db_comment="Message of the review comment")
     review_creation_date = models.DateTimeField(db_comment="Timestamp when the review was created")
     review_answer_timestamp = models.DateTimeField(null=True, blank=True, db_comment="Timestamp when the review was answered by the seller")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    SEARCH_CONFIG = "portuguese"
+    # computed by PostgreSQL on every INSERT/UPDATE, including QuerySet.update() and bulk_create()
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("review_comment_title", weight="A", config=SEARCH_CONFIG)
+            + SearchVector("review_comment_message", weight="B", config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        db_comment="Portuguese tsvector of the comment title (A) and message (B)",
+    )
+
     class Meta:
         db_table = "review"
         verbose_name_plural = "Reviews"
+        indexes = [
+            models.Index(fields=["review_score"], name="review_score_idx"),
+            models.Index(fields=["review_creation_date"], name="review_creation_date_idx"),
+            GinIndex(fields=["search_vector"], name="review_search_vector_idx"),
+        ]
 
 
 
@@ -280,5 +373,35 @@ class CartItem(models.Model):
         db_table = "cart_item"
         ordering = ['added_at']
         verbose_name_plural = "Cart Items"
+        constraints = [
+            models.UniqueConstraint(fields=["cart", "product"], name="cart_item_unique_product"),
+        ]
+
+
 
 
+
+class OrderTimeBucket(models.Model):
+    GRANULARITY_CHOICES = [
+        ("hour", "Hour"),
+        ("day", "Day"),
+        ("week", "Week"),
+        ("month", "Month"),
+    ]
+
+    granularity = models.CharField(max_length=5, choices=GRANULARITY_CHOICES, db_comment="Bucket size (hour, day, week, month)")
+    bucket_start = models.DateTimeField(db_comment="Start of the bucket (UTC), truncated to the granularity")
+    order_count = models.PositiveIntegerField(default=0, db_comment="Orders purchased in the bucket")
+    item_count = models.PositiveIntegerField(default=0, db_comment="Order items of those orders")
+    item_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, db_comment="Sum of order_item_price")
+    freight_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, db_comment="Sum of order_item_freight_value")
+    payment_value = models.DecimalField(max_digits=14, decimal_places=2, default=0, db_comment="Sum of payment_value")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "order_time_bucket"
+        ordering = ["granularity", "bucket_start"]
+        verbose_name_plural = "Order Time Buckets"
+        constraints = [
+            models.UniqueConstraint(fields=["granularity", "bucket_start"], name="order_time_bucket_unique"),
+        ]
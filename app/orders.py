@@ -0,0 +1,120 @@
+import base64
+import hashlib
+import json
+import uuid
+from collections import defaultdict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from app.models import Order
+
+ORDER_FIELDS = (
+    "order_id", "customer_id", "order_status", "order_purchase_timestamp", "order_approved_at",
+    "order_delivered_carrier_date", "order_delivered_customer_date", "order_estimated_delivery_date",
+)
+
+# related_name on Order -> columns serialized for each child row
+ORDER_CHILDREN = {
+    "order_items": (
+        "order_item_id", "product_id", "seller_id", "order_item_sequence_number",
+        "order_item_price", "order_item_freight_value", "shipping_limit_date",
+    ),
+    "payments": (
+        "payment_id", "payment_type", "payment_sequential", "payment_timestamp",
+        "payment_installments", "payment_value",
+    ),
+    "reviews": (
+        "review_id", "review_score", "review_comment_title", "review_comment_message",
+        "review_creation_date", "review_answer_timestamp",
+    ),
+}
+
+# related_name on Order -> ordering of the child rows (the primary key breaks ties)
+ORDER_CHILDREN_ORDERING = {
+    "order_items": ("order_item_sequence_number", "order_item_id"),
+    "payments": ("payment_sequential", "payment_id"),
+    "reviews": ("review_creation_date", "review_id"),
+}
+
+TRACKING_FIELDS = (
+    "order_id", "order_status", "order_purchase_timestamp", "order_approved_at",
+    "order_delivered_carrier_date", "order_delivered_customer_date", "order_estimated_delivery_date",
+)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(row):
+    payload = json.dumps([row["order_purchase_timestamp"].isoformat(), str(row["order_id"])])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        timestamp, order_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        timestamp, order_id = parse_datetime(timestamp), uuid.UUID(order_id)
+    except (ValueError, TypeError, AttributeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+    if timestamp is None:
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+    return timestamp, order_id
+
+
+def prefetch_children(order_ids, related_names=ORDER_CHILDREN):
+    """
+    One query per related_name, grouped by order id: {related_name: {order_id: [rows]}}.
+    Rows keep the ORDER_CHILDREN_ORDERING order so responses are stable between calls.
+    """
+    children = {}
+    for related_name, fields in related_names.items():
+        relation = Order._meta.get_field(related_name)
+        fk = relation.field.attname
+        grouped = defaultdict(list)
+        ordering = ORDER_CHILDREN_ORDERING.get(related_name, ("pk",))
+        rows = relation.related_model.objects.filter(**{f"{fk}__in": order_ids}).order_by(*ordering).values(fk, *fields)
+        for row in rows:
+            grouped[row.pop(fk)].append(row)
+        children[related_name] = grouped
+    return children
+
+
+def serialize_orders(rows):
+    rows = list(rows)
+    if not rows:
+        return []
+    children = prefetch_children([row["order_id"] for row in rows])
+    for row in rows:
+        for related_name, grouped in children.items():
+            row[related_name] = grouped.get(row["order_id"], [])
+    return rows
+
+
+def order_page(cursor=None, limit=DEFAULT_PAGE_SIZE, queryset=None):
+    """Keyset page of orders ordered by (order_purchase_timestamp, order_id); returns (rows, next_cursor)."""
+    queryset = Order.objects.all() if queryset is None else queryset
+    if cursor:
+        timestamp, order_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(order_purchase_timestamp__gt=timestamp)
+            | Q(order_purchase_timestamp=timestamp, order_id__gt=order_id)
+        )
+    rows = list(queryset.order_by("order_purchase_timestamp", "order_id").values(*ORDER_FIELDS)[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return serialize_orders(rows[:limit]), next_cursor
+
+
+def order_detail(order_id):
+    rows = serialize_orders(Order.objects.filter(pk=order_id).values(*ORDER_FIELDS))
+    return rows[0] if rows else None
+
+
+def tracking_etag(row):
+    """Strong ETag derived from the order status and its delivery timestamps."""
+    payload = "|".join(str(row[field]) for field in TRACKING_FIELDS)
+    return '"%s"' % hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
@@ -0,0 +1,32 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using="default"):
+    """Planner estimate from pg_class.reltuples; None when the table was never analyzed."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+            [connections[using].ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that skips COUNT(*) on large unfiltered tables and uses the planner estimate instead."""
+
+    # below this many rows an exact count is cheap enough
+    exact_count_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if getattr(queryset, "query", None) is not None and not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate >= self.exact_count_threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,122 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+_IN_LIST = re.compile(r"\bIN \(\?(?:, \?)*\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Normalize a statement so that executions differing only by parameters compare equal."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` that records count, time and fingerprints of every statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def repeated(self, threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        """Fingerprints executed at least ``threshold`` times: likely N+1 patterns."""
+        return {sql: count for sql, count in self.fingerprints.most_common() if count >= threshold}
+
+
+@contextmanager
+def record_queries(aliases=None):
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for alias in aliases or connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        yield recorder
+
+
+class ProfileStats:
+    """Process-wide aggregate of profiled requests, keyed by view name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(lambda: {
+            "requests": 0, "queries": 0, "db_time_ms": 0.0, "max_queries": 0, "n_plus_one": Counter(),
+        })
+
+    def add(self, view, recorder, repeated):
+        with self._lock:
+            entry = self._views[view]
+            entry["requests"] += 1
+            entry["queries"] += recorder.count
+            entry["db_time_ms"] += recorder.duration * 1000
+            entry["max_queries"] = max(entry["max_queries"], recorder.count)
+            entry["n_plus_one"].update(repeated.keys())
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view: {
+                    "requests": entry["requests"],
+                    "avg_queries": entry["queries"] / entry["requests"],
+                    "avg_db_time_ms": round(entry["db_time_ms"] / entry["requests"], 3),
+                    "max_queries": entry["max_queries"],
+                    "n_plus_one": dict(entry["n_plus_one"]),
+                }
+                for view, entry in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+stats = ProfileStats()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries, n_plus_one_threshold=None, aliases=None):
+    """
+    Test helper: fail when the block runs more than ``max_queries`` statements, or repeats one
+    fingerprint ``n_plus_one_threshold`` times or more.
+
+        with query_budget(4):
+            self.client.get(reverse("order-list"))
+    """
+    with record_queries(aliases) as recorder:
+        yield recorder
+    problems = []
+    if recorder.count > max_queries:
+        problems.append(f"{recorder.count} queries executed, budget is {max_queries}")
+    if n_plus_one_threshold is not None:
+        for sql, count in recorder.repeated(n_plus_one_threshold).items():
+            problems.append(f"possible N+1, {count}x: {sql}")
+    if problems:
+        details = "\n".join(f"  {count}x {sql}" for sql, count in recorder.fingerprints.most_common())
+        raise QueryBudgetExceeded("\n".join(problems) + "\nQueries:\n" + details)
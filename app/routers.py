@@ -0,0 +1,112 @@
+import contextvars
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_PREFIX = "replica"
+
+# per request (or per command) routing state: {"pinned": bool, "wrote": bool}
+_routing = contextvars.ContextVar("db_routing", default=None)
+_lag_cache = {}
+
+
+def _state():
+    state = _routing.get()
+    if state is None:
+        state = {"pinned": False, "wrote": False}
+        _routing.set(state)
+    return state
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+def replica_lag(alias):
+    """Replication lag of ``alias`` in seconds, cached for REPLICA_LAG_CHECK_INTERVAL; inf when unreachable."""
+    now = time.monotonic()
+    checked_at, lag = _lag_cache.get(alias, (None, None))
+    if checked_at is not None and now - checked_at < getattr(settings, "REPLICA_LAG_CHECK_INTERVAL", 5):
+        return lag
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+            )
+            lag = float(cursor.fetchone()[0] or 0)
+    except DatabaseError as e:
+        logger.warning(f"Replica {alias} unavailable: {e}")
+        lag = float("inf")
+    _lag_cache[alias] = (now, lag)
+    return lag
+
+
+def healthy_replicas():
+    max_lag = getattr(settings, "REPLICA_MAX_LAG_SECONDS", 30)
+    return [alias for alias in replica_aliases() if replica_lag(alias) <= max_lag]
+
+
+def read_database():
+    """A healthy replica, or the primary when none is configured or all of them lag."""
+    replicas = healthy_replicas()
+    return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+
+def analytics_database():
+    """Alias heavy read-only jobs (exports, aggregates) should use explicitly with .using()."""
+    return read_database()
+
+
+def wrote_to_primary():
+    return _state()["wrote"]
+
+
+@contextmanager
+def use_primary():
+    """Send every read in the block to the primary (read-your-writes paths)."""
+    state = _state()
+    previous = state["pinned"]
+    state["pinned"] = True
+    try:
+        yield
+    finally:
+        state["pinned"] = previous
+
+
+def start_request(pinned=False):
+    return _routing.set({"pinned": pinned, "wrote": False})
+
+
+def end_request(token):
+    _routing.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Reads go to a replica unless the current request/command is pinned to the primary,
+    has already written, or runs inside a transaction on the primary; writes always go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state()
+        if state["pinned"] or state["wrote"] or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return read_database()
+
+    def db_for_write(self, model, **hints):
+        _state()["wrote"] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import OperationalError, connection, transaction
+from django.db.models import F
+
+from app.models import Review
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def search_reviews(text, score=None, since=None, until=None, limit=DEFAULT_LIMIT):
+    """
+    Ranked full-text search over review comments.
+
+    Matching and ranking run against the GIN-indexed tsvector; headlines, which need the raw
+    text, are only computed for the returned page. The whole search is bounded by
+    REVIEW_SEARCH_TIMEOUT_MS through a transaction-local statement_timeout.
+    """
+    query = SearchQuery(text, config=Review.SEARCH_CONFIG, search_type="websearch")
+    queryset = Review.objects.filter(search_vector=query)
+    if score is not None:
+        queryset = queryset.filter(review_score=score)
+    if since is not None:
+        queryset = queryset.filter(review_creation_date__gte=since)
+    if until is not None:
+        queryset = queryset.filter(review_creation_date__lt=until)
+
+    timeout_ms = getattr(settings, "REVIEW_SEARCH_TIMEOUT_MS", 2000)
+    try:
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL statement_timeout = %s", [timeout_ms])
+            ranked = list(
+                queryset.annotate(rank=SearchRank(F("search_vector"), query))
+                .order_by("-rank", "review_id")
+                .values_list("review_id", "rank")[:min(limit, MAX_LIMIT)]
+            )
+            if not ranked:
+                return []
+            ranks = dict(ranked)
+            headline_options = {"config": Review.SEARCH_CONFIG, "start_sel": "<mark>", "stop_sel": "</mark>"}
+            rows = Review.objects.filter(pk__in=ranks).annotate(
+                title_headline=SearchHeadline("review_comment_title", query, **headline_options),
+                message_headline=SearchHeadline("review_comment_message", query, **headline_options),
+            ).values(
+                "review_id", "order_id", "review_score", "review_creation_date",
+                "title_headline", "message_headline",
+            )
+            rows = {row["review_id"]: row for row in rows}
+    except OperationalError as e:
+        # 57014 = query_canceled, raised when statement_timeout fires
+        if getattr(e.__cause__, "pgcode", None) != "57014":
+            raise
+        raise SearchTimeout(f"Review search exceeded {timeout_ms} ms") from e
+
+    return [{**rows[review_id], "rank": rank} for review_id, rank in ranked]
@@ -0,0 +1,34 @@
+import sys
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.cache import invalidate_lists, invalidate_object
+from app.models import Category, Geolocation, Product
+
+
+# the catalog entries are dropped once the write is committed: invalidating inside the
+# transaction would let another worker cache the old rows again under the new generation
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_object, Category, instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Product)
+def product_changed(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_object, Product, instance.pk))
+    # the category tree carries product counts
+    transaction.on_commit(partial(invalidate_lists, Category))
+
+
+@receiver([post_save, post_delete], sender=Geolocation)
+def geolocation_changed(sender, **kwargs):
+    # app.geocoder pulls in NumPy, so it is not imported at app loading; if nothing imported it
+    # yet, this process holds no geocoder to invalidate
+    geocoder = sys.modules.get("app.geocoder")
+    if geocoder is not None:
+        geocoder.invalidate_geocoder()
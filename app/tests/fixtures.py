@@ -0,0 +1,193 @@
+"""
+Shared test data: small model factories, and the data set of the import pipeline tests.
+
+The CSV set is written once per test process, and ``load_data_raw`` runs once per process:
+the rows it produced are kept in memory and bulk inserted by every later
+``ImportedDataTestCase`` (inside its class-wide transaction, so nothing leaks between classes).
+Under ``manage.py test --parallel`` each worker is a separate process with its own cloned
+database, so workers never share files or snapshots.
+"""
+import atexit
+import csv
+import functools
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from app.models import Category, Customer, Geolocation, Order, OrderItem, OrderTimeBucket, Payment, Product, Review, Seller
+
+
+def make_geolocation(zip_code_prefix="01001", **fields):
+    """The Geolocation of ``zip_code_prefix``, created on first use (the prefix is the primary key)."""
+    fields = {"geolocation_lat": -23.5, "geolocation_lng": -46.6, **fields}
+    return Geolocation.objects.get_or_create(geolocation_zip_code_prefix=zip_code_prefix, defaults=fields)[0]
+
+
+def make_customer(geolocation=None, **fields):
+    return Customer.objects.create(customer_zip_code_prefix=geolocation or make_geolocation(), **fields)
+
+
+def make_seller(geolocation=None, **fields):
+    return Seller.objects.create(seller_zip_code_prefix=geolocation or make_geolocation(), **fields)
+
+
+def make_category(name="esporte_lazer", **fields):
+    return Category.objects.create(product_category_name=name, **fields)
+
+
+def make_product(category, **fields):
+    fields = {
+        "product_description": 10, "product_photo": 1, "product_weight_g": 100,
+        "product_length_cm": 10, "product_height_cm": 10, "product_width_cm": 10, **fields,
+    }
+    return Product.objects.create(category=category, **fields)
+
+
+PRODUCT_ID = "5a3f1c3e0b6a4c7e9d2f8b1a6c4e2d90"
+CUSTOMER_ID = "9c1d2e3f4a5b4c6d8e7f0a1b2c3d4e5f"
+SELLER_ID = "0f1e2d3c4b5a49687766554433221100"
+ORDER_ID = "e481f51cbdc54678b7cc49136f2d6af7"
+REVIEW_ID = "7bc2406110b926393aa56f80a40eba40"
+
+# load_data_raw option -> (file name, rows); columns are those of the Olist files
+IMPORT_CSVS = {
+    "geolocations": ("geolocations.csv", [{
+        'geolocation_zip_code_prefix': 12345,
+        'geolocation_lat': 12.34,
+        'geolocation_lng': 56.78,
+        'geolocation_city': 'Test City',
+        'geolocation_state': 'TS',
+    }]),
+    "category": ("categories.csv", [{
+        'product_category_name': 'Test Category name portuguese',
+        'product_category_name_english': 'Test Category name english',
+    }]),
+    "products": ("products.csv", [{
+        'product_id': PRODUCT_ID,
+        'product_category_name': 'Test Category name portuguese',
+        'product_name_lenght': 10,
+        'product_description_lenght': 20,
+        'product_photos_qty': 5,
+        'product_weight_g': 500,
+        'product_length_cm': 30,
+        'product_height_cm': 20,
+        'product_width_cm': 15,
+    }]),
+    "customers": ("customers.csv", [{
+        'customer_id': CUSTOMER_ID,
+        'customer_first_name': 'John',
+        'customer_last_name': 'Doe',
+        'customer_city': 'Test City',
+        'customer_state': 'TS',
+        'address': 'Test Address',
+        'customer_zip_code_prefix': 12345,
+    }]),
+    "seller": ("sellers.csv", [{
+        'seller_id': SELLER_ID,
+        'seller_first_name': 'Jane',
+        'seller_zip_code_prefix': 12345,
+        'seller_last_name': 'Smith',
+        'seller_phone_number': '123-456-7890',
+        'seller_city': 'Test City',
+        'seller_state': 'TS',
+        'seller_address': 'Test Address',
+    }]),
+    "orders": ("orders.csv", [{
+        'order_id': ORDER_ID,
+        'customer_id': CUSTOMER_ID,
+        'order_status': 'delivered',
+        'order_purchase_timestamp': '2024-01-01 10:00:00',
+        'order_approved_at': '2024-01-01 11:00:00',
+        'order_delivered_carrier_date': '2024-01-02 10:00:00',
+        'order_delivered_customer_date': '2024-01-03 10:00:00',
+        'order_estimated_delivery_date': '2024-01-04 10:00:00',
+    }]),
+    "order_items": ("order_items.csv", [{
+        'order_id': ORDER_ID,
+        'order_item_id': 1,
+        'product_id': PRODUCT_ID,
+        'seller_id': SELLER_ID,
+        'shipping_limit_date': '2024-01-05 10:00:00',
+        'price': 100.0,
+        'freight_value': 10.0,
+    }]),
+    "payment": ("payments.csv", [{
+        'order_id': ORDER_ID,
+        'payment_sequential': 1,
+        'payment_type': 'credit_card',
+        'payment_installments': 1,
+        'payment_value': 100.0,
+    }]),
+    "review": ("reviews.csv", [{
+        'review_id': REVIEW_ID,
+        'order_id': ORDER_ID,
+        'review_score': 5,
+        'review_comment_title': 'Great product!',
+        'review_comment_message': 'I loved this product, it exceeded my expectations.',
+        'review_creation_date': '2024-01-10 10:00:00',
+        'review_answer_timestamp': '2024-01-11 10:00:00',
+    }]),
+}
+
+# tables written by load_data_raw, parents first
+IMPORTED_MODELS = (Geolocation, Category, Product, Customer, Seller, Order, OrderItem, Payment, Review, OrderTimeBucket)
+
+
+@functools.cache
+def _csv_dir(pid):
+    directory = tempfile.mkdtemp(prefix=f"olist-import-{pid}-")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    for filename, rows in IMPORT_CSVS.values():
+        with open(os.path.join(directory, filename), "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return directory
+
+
+def import_options():
+    """``call_command("load_data_raw", **import_options())`` arguments for the shared CSV set."""
+    # keyed by pid: a forked worker must not remove (at exit) the directory of its parent
+    directory = _csv_dir(os.getpid())
+    return {option: os.path.join(directory, filename) for option, (filename, _) in IMPORT_CSVS.items()}
+
+
+def run_import():
+    call_command("load_data_raw", **import_options())
+
+
+_snapshot = None
+
+
+def take_snapshot():
+    snapshot = []
+    for model in IMPORTED_MODELS:
+        # generated columns (Review.search_vector) are computed by the database on insert
+        fields = [field.attname for field in model._meta.concrete_fields if not field.generated]
+        snapshot.append((model, list(model.objects.order_by("pk").values(*fields))))
+    return snapshot
+
+
+def restore_snapshot(snapshot):
+    for model, rows in snapshot:
+        model.objects.bulk_create([model(**row) for row in rows])
+
+
+class ImportedDataTestCase(TestCase):
+    """
+    TestCase whose class data is the result of ``load_data_raw`` on the shared CSV set.
+    The command really runs for the first class of the process; later classes get the same
+    rows from the in-memory snapshot.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        global _snapshot
+        if _snapshot is None:
+            run_import()
+            _snapshot = take_snapshot()
+        else:
+            restore_snapshot(_snapshot)
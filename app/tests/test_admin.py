@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from app.models import Geolocation
+from app.paginators import EstimatedCountPaginator
+from app.tests.fixtures import make_geolocation
+
+
+class TestEstimatedCountPaginator(TestCase):
+    def setUp(self):
+        make_geolocation()
+
+    def test_exact_count_for_small_tables(self):
+        paginator = EstimatedCountPaginator(Geolocation.objects.all(), 10)
+        self.assertEqual(paginator.count, 1)
+
+    def test_estimate_for_large_unfiltered_tables(self):
+        with mock.patch("app.paginators.estimated_row_count", return_value=5_000_000):
+            self.assertEqual(EstimatedCountPaginator(Geolocation.objects.all(), 10).count, 5_000_000)
+            filtered = Geolocation.objects.filter(geolocation_state="SP")
+            self.assertEqual(EstimatedCountPaginator(filtered, 10).count, 0)
+
+
+class TestAdminChangelists(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(user)
+
+    def test_changelists_render(self):
+        for model in ("geolocation", "customer", "seller", "category", "product", "order",
+                      "orderitem", "payment", "review", "cart", "cartitem"):
+            response = self.client.get(reverse(f"admin:app_{model}_changelist"), {"q": "01001"})
+            self.assertEqual(response.status_code, 200, model)
+
+    def test_list_filters_do_not_scan_distinct_values(self):
+        make_geolocation(geolocation_state="SP")
+        url = reverse("admin:app_geolocation_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertFalse([q["sql"] for q in queries if "DISTINCT" in q["sql"]])
+        self.assertEqual(len(self.client.get(url, {"geolocation_state": "SP"}).context["cl"].result_list), 1)
+        self.assertEqual(len(self.client.get(url, {"geolocation_state": "RJ"}).context["cl"].result_list), 0)
+        self.assertEqual(response.status_code, 200)
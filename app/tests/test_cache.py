@@ -0,0 +1,71 @@
+import uuid
+
+from django.test import TestCase
+from django.urls import reverse
+
+from app import cache as catalog_cache
+from app.categories import get_category_tree
+from app.models import Category
+from app.tests.fixtures import make_category, make_product
+
+
+class TestCatalogCache(TestCase):
+    def setUp(self):
+        catalog_cache.get_cache().clear()
+        catalog_cache.stats.reset()
+        self.category = make_category("beleza_saude", product_category_name_english="health_beauty")
+
+    def test_object_read_through(self):
+        self.assertEqual(catalog_cache.get_category(self.category.pk), self.category)
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog_cache.get_category(self.category.pk), self.category)
+        self.assertEqual(catalog_cache.stats.snapshot()["category"], {"hits": 1, "misses": 1})
+
+    def test_post_save_invalidates_object_and_lists(self):
+        self.assertEqual(get_category_tree()[0]["name_english"], "health_beauty")
+        self.category.product_category_name_english = "beauty"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.save()
+        self.assertEqual(get_category_tree()[0]["name_english"], "beauty")
+        self.assertEqual(catalog_cache.get_category(self.category.pk).product_category_name_english, "beauty")
+
+    def test_invalidation_waits_for_commit(self):
+        get_category_tree()
+        with self.captureOnCommitCallbacks() as callbacks:
+            make_category("jardim")
+            # still inside the transaction: a concurrent reader must not re-cache under a new generation
+            self.assertEqual(len(get_category_tree()), 1)
+        self.assertEqual(len(get_category_tree()), 1)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(get_category_tree()), 2)
+
+    def test_bulk_invalidation(self):
+        get_category_tree()
+        Category.objects.bulk_create([Category(product_category_name="bulk")])
+        self.assertEqual(len(get_category_tree()), 1)
+        catalog_cache.invalidate_catalog()
+        self.assertEqual(len(get_category_tree()), 2)
+
+    def test_category_products_endpoint_is_cached(self):
+        url = reverse("category-products", args=[self.category.pk])
+        self.assertEqual(self.client.get(url).json()["count"], 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json()["count"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_product(self.category)
+        self.assertEqual(self.client.get(url).json()["count"], 1)
+
+    def test_product_detail_is_read_through(self):
+        product = make_product(self.category, product_weight_g=250)
+        url = reverse("product-detail", args=[product.pk])
+        self.assertEqual(self.client.get(url).json()["category_name_english"], "health_beauty")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json()["product_weight_g"], 250)
+        self.assertEqual(catalog_cache.stats.snapshot()["product"], {"hits": 1, "misses": 1})
+
+        product.product_weight_g = 300
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        self.assertEqual(self.client.get(url).json()["product_weight_g"], 300)
+        self.assertEqual(self.client.get(reverse("product-detail", args=[uuid.uuid4()])).status_code, 404)
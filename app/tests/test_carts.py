@@ -0,0 +1,153 @@
+import json
+import threading
+import uuid
+from decimal import Decimal
+
+from django.db import close_old_connections, connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.urls import reverse
+from django.utils import timezone
+
+from app import carts
+from app.models import Cart, CartItem
+from app.tests.fixtures import make_category, make_customer, make_product
+
+
+def make_cart_fixture(product_count):
+    customer = make_customer()
+    category = make_category("brinquedos")
+    products = [make_product(category) for _ in range(product_count)]
+    cart = Cart.objects.create(customer=customer, created_at=timezone.now(), cart_total_amount=Decimal("0"))
+    return cart, products
+
+
+def assert_totals_consistent(testcase, cart):
+    cart.refresh_from_db()
+    expected = CartItem.objects.filter(cart=cart).aggregate(total=Sum("subtotal"))["total"] or Decimal("0")
+    testcase.assertEqual(cart.cart_total_amount, expected)
+    return cart.cart_total_amount
+
+
+class TestCartService(TestCase):
+    def setUp(self):
+        self.cart, self.products = make_cart_fixture(3)
+
+    def test_add_update_remove(self):
+        first, second, _ = self.products
+        self.assertEqual(carts.add_item(self.cart.pk, first.pk, 2, "10.00"), Decimal("20.00"))
+        self.assertEqual(carts.add_item(self.cart.pk, first.pk, 1, "10.00"), Decimal("30.00"))
+        self.assertEqual(carts.add_item(self.cart.pk, second.pk, 1, "5.50"), Decimal("35.50"))
+        self.assertEqual(carts.update_item(self.cart.pk, first.pk, 1), Decimal("15.50"))
+        self.assertEqual(carts.remove_item(self.cart.pk, second.pk), Decimal("10.00"))
+        self.assertEqual(assert_totals_consistent(self, self.cart), Decimal("10.00"))
+
+    def test_batch_is_a_fixed_number_of_queries(self):
+        changes = [{"op": "add", "product_id": p.pk, "quantity": 1, "unit_price": "1.00"} for p in self.products]
+        # savepoint, lock, fetch items, bulk insert, total update, release savepoint
+        with self.assertNumQueries(6):
+            carts.apply_changes(self.cart.pk, changes)
+        assert_totals_consistent(self, self.cart)
+
+    def test_invalid_changes(self):
+        with self.assertRaises(carts.CartError):
+            carts.add_item(self.cart.pk, self.products[0].pk, 0, "1.00")
+        with self.assertRaises(carts.CartError):
+            carts.apply_changes(self.cart.pk, [{"op": "explode", "product_id": self.products[0].pk}])
+        for price in ("abc", "NaN", "-1.00", "1.005", "100000000.00"):
+            with self.assertRaises(carts.CartError):
+                carts.add_item(self.cart.pk, self.products[0].pk, 1, price)
+        # values that would overflow numeric(10,2) are rejected before any write
+        with self.assertRaises(carts.CartError):
+            carts.add_item(self.cart.pk, self.products[0].pk, carts.MAX_QUANTITY + 1, "1.00")
+        with self.assertRaises(carts.CartError):
+            carts.add_item(self.cart.pk, self.products[0].pk, carts.MAX_QUANTITY, "99999.99")
+        with self.assertRaises(carts.CartError):
+            carts.apply_changes(self.cart.pk, [
+                {"op": "add", "product_id": p.pk, "quantity": 1, "unit_price": "60000000.00"} for p in self.products[:2]
+            ])
+        with self.assertRaises(carts.CartNotFound):
+            carts.add_item(uuid.uuid4(), self.products[0].pk, 1, "1.00")
+        assert_totals_consistent(self, self.cart)
+
+    def test_endpoints(self):
+        product = self.products[0]
+        response = self.client.post(
+            reverse("cart-items", args=[self.cart.pk]),
+            json.dumps({"product_id": str(product.pk), "quantity": 2, "unit_price": 3.25}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json()["cart_total_amount"], "6.50")
+        response = self.client.post(
+            reverse("cart-items", args=[self.cart.pk]),
+            json.dumps({"product_id": str(product.pk), "quantity": 1, "unit_price": "abc"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(
+            reverse("cart-item", args=[self.cart.pk, product.pk]),
+            json.dumps({"quantity": 4}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json()["cart_total_amount"], "13.00")
+        response = self.client.delete(reverse("cart-item", args=[self.cart.pk, product.pk]))
+        self.assertEqual(response.json()["cart_total_amount"], "0.00")
+        response = self.client.post(
+            reverse("cart-items-batch", args=[self.cart.pk]), json.dumps({"changes": "nope"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            reverse("cart-items", args=[self.cart.pk]),
+            json.dumps({"product_id": str(product.pk), "quantity": 10**12, "unit_price": "1.00"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            reverse("cart-items", args=[uuid.uuid4()]),
+            json.dumps({"product_id": str(product.pk), "quantity": 1, "unit_price": "1.00"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class TestCartConcurrency(TransactionTestCase):
+    threads = 8
+    operations_per_thread = 25
+
+    def setUp(self):
+        self.cart, self.products = make_cart_fixture(4)
+
+    def test_totals_never_drift(self):
+        errors = []
+        barrier = threading.Barrier(self.threads)
+
+        def worker(index):
+            try:
+                barrier.wait()
+                for i in range(self.operations_per_thread):
+                    product = self.products[(index + i) % len(self.products)]
+                    if i % 5 == 4:
+                        carts.remove_item(self.cart.pk, product.pk)
+                    elif i % 3 == 0:
+                        carts.apply_changes(self.cart.pk, [
+                            {"op": "add", "product_id": p.pk, "quantity": 1, "unit_price": "2.50"}
+                            for p in self.products[:2]
+                        ])
+                    else:
+                        carts.add_item(self.cart.pk, product.pk, 1, "2.50")
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        close_old_connections()
+
+        self.assertEqual(errors, [])
+        assert_totals_consistent(self, self.cart)
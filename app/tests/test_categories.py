@@ -0,0 +1,57 @@
+from django.test import TestCase
+
+from app import cache as catalog_cache
+from app.categories import get_category_tree, rebuild_category_paths
+from app.models import Category
+from app.tests.fixtures import make_category, make_product
+
+
+class TestCategoryTree(TestCase):
+    def setUp(self):
+        catalog_cache.get_cache().clear()
+        self.root = make_category("casa")
+        self.child = make_category("cozinha", parent_category=self.root)
+        self.leaf = make_category("panelas", parent_category=self.child)
+
+    def test_paths_are_maintained_on_save(self):
+        self.leaf.refresh_from_db()
+        self.assertEqual(self.leaf.depth, 2)
+        self.assertEqual(
+            self.leaf.path,
+            Category.path_segment(self.root.pk) + Category.path_segment(self.child.pk) + Category.path_segment(self.leaf.pk),
+        )
+        self.assertEqual(set(self.root.get_descendants()), {self.root, self.child, self.leaf})
+
+    def test_move_subtree_rewrites_descendants(self):
+        other = make_category("jardim")
+        self.child.parent_category = other
+        self.child.save()
+        self.leaf.refresh_from_db()
+        self.assertTrue(self.leaf.path.startswith(other.path))
+        self.assertEqual(self.leaf.depth, 2)
+        self.assertEqual(set(self.root.get_descendants()), {self.root})
+
+    def test_cannot_move_under_own_subtree(self):
+        self.root.parent_category = self.leaf
+        with self.assertRaises(ValueError):
+            self.root.save()
+
+    def test_subtree_products_is_one_query(self):
+        make_product(self.root)
+        make_product(self.leaf)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.root.get_subtree_products().count(), 2)
+
+    def test_rebuild_after_bulk_create(self):
+        Category.objects.bulk_create([Category(product_category_name="bulk")])
+        self.assertEqual(Category.objects.get(product_category_name="bulk").path, "")
+        rebuild_category_paths()
+        bulk = Category.objects.get(product_category_name="bulk")
+        self.assertEqual(bulk.path, Category.path_segment(bulk.pk))
+
+    def test_tree_rolls_up_product_counts(self):
+        make_product(self.leaf)
+        tree = get_category_tree()
+        self.assertEqual(len(tree), 1)
+        self.assertEqual(tree[0]["subtree_product_count"], 1)
+        self.assertEqual(tree[0]["children"][0]["children"][0]["product_count"], 1)
@@ -0,0 +1,55 @@
+import datetime
+import os
+import tempfile
+
+import pyarrow.parquet as pq
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from app.models import Order
+from app.tests.fixtures import make_customer
+
+
+class TestExportLake(TestCase):
+    def setUp(self):
+        self.customer = make_customer()
+        self.day = timezone.make_aware(datetime.datetime(2018, 5, 1, 10))
+        for i in range(3):
+            Order.objects.create(customer=self.customer, order_status="delivered",
+                                 order_purchase_timestamp=self.day + datetime.timedelta(days=i % 2))
+        self.target = tempfile.mkdtemp()
+
+    def export(self, **options):
+        call_command("export_lake", target=self.target, tables=["order"], chunk_size=2, stdout=open(os.devnull, "w"), **options)
+
+    def test_partitioned_by_purchase_date(self):
+        self.export()
+        partitions = sorted(os.listdir(os.path.join(self.target, "order")))
+        self.assertEqual(partitions, ["dt=2018-05-01", "dt=2018-05-02"])
+        table = pq.read_table(os.path.join(self.target, "order", "dt=2018-05-01"))
+        self.assertEqual(table.num_rows, 2)
+        self.assertIn("customer_id", table.column_names)
+
+    def test_incremental_only_exports_new_rows(self):
+        self.export(incremental=True)
+        Order.objects.create(customer=self.customer, order_status="shipped",
+                             order_purchase_timestamp=self.day + datetime.timedelta(days=5))
+        self.export(incremental=True)
+        self.assertEqual(pq.read_table(os.path.join(self.target, "order")).num_rows, 4)
+
+    def test_incremental_reexports_updates_once(self):
+        self.export(incremental=True)
+        self.export(incremental=True)
+        self.assertEqual(pq.read_table(os.path.join(self.target, "order")).num_rows, 3)
+        order = Order.objects.first()
+        order.order_status = "canceled"
+        order.save()
+        self.export(incremental=True)
+        self.assertEqual(pq.read_table(os.path.join(self.target, "order")).num_rows, 4)
+
+    def test_bounded_open_writers(self):
+        # rows alternate between two partitions but only one file may be open at a time
+        self.export(max_open_writers=1)
+        table = pq.read_table(os.path.join(self.target, "order"))
+        self.assertEqual(table.num_rows, 3)
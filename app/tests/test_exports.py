@@ -0,0 +1,51 @@
+import csv
+import datetime
+import io
+import json
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import Order, Payment
+from app.tests.fixtures import make_customer
+
+
+class TestStreamingExports(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sp = make_customer(customer_state="SP")
+        rj = make_customer(customer_state="RJ")
+        day = timezone.make_aware(datetime.datetime(2018, 2, 1))
+        for i, customer in enumerate([sp, sp, rj]):
+            order = Order.objects.create(customer=customer, order_status="delivered",
+                                         order_purchase_timestamp=day + datetime.timedelta(days=i))
+            Payment.objects.create(order=order, payment_type="credit_card", payment_sequential=1,
+                                   payment_timestamp=order.order_purchase_timestamp, payment_value=Decimal("9.90"))
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_orders_filtered_by_state(self):
+        response = self.client.get(reverse("export-dataset", args=["orders", "csv"]), {"state": "sp"})
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row["customer_state"] for row in rows}, {"SP"})
+
+    def test_ndjson_payments_filtered_by_date(self):
+        response = self.client.get(
+            reverse("export-dataset", args=["payments", "ndjson"]), {"start": "2018-02-02", "end": "2018-02-03"},
+        )
+        lines = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["payment_value"], "9.90")
+
+    async def test_async_streaming(self):
+        response = await self.async_client.get(reverse("export-dataset", args=["orders", "ndjson"]))
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(b"".join(chunks).decode().splitlines()), 3)
+
+    def test_unknown_dataset(self):
+        self.assertEqual(self.client.get(reverse("export-dataset", args=["customers", "csv"])).status_code, 404)
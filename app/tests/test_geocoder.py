@@ -0,0 +1,56 @@
+import numpy as np
+from django.test import TestCase
+from django.urls import reverse
+
+from app.geocoder import ZipGeocoder, get_geocoder
+
+
+class TestZipGeocoder(TestCase):
+    def setUp(self):
+        self.geocoder = ZipGeocoder(
+            prefixes=np.array([22041, 1001, 13165]),
+            lat=[-22.97, -23.55, -22.87],
+            lng=[-43.18, -46.63, -47.15],
+            states=["RJ", "SP", "SP"],
+            cities=["rio de janeiro", "sao paulo", "campinas"],
+        )
+
+    def test_lookup(self):
+        self.assertEqual(self.geocoder.lookup("01001")["city"], "sao paulo")
+        self.assertEqual(self.geocoder.lookup(22041)["state"], "RJ")
+        self.assertIsNone(self.geocoder.lookup("99999"))
+        self.assertIsNone(self.geocoder.lookup("not-a-zip"))
+
+    def test_vectorized_geocode(self):
+        result = self.geocoder.geocode(np.array([1001, 99999, 13165, -4]))
+        self.assertEqual(result["found"].tolist(), [True, False, True, False])
+        self.assertEqual(result["state"].tolist(), ["SP", "", "SP", ""])
+        self.assertTrue(np.isnan(result["lat"][1]))
+        self.assertEqual(self.geocoder.zip_codes([1001.0, np.nan]).tolist(), ["01001", None])
+
+    def test_compact(self):
+        # the direct index dominates; it is fixed size whatever the number of rows
+        self.assertLess(self.geocoder.nbytes, 500_000)
+
+
+class TestSharedGeocoder(TestCase):
+    def test_reloads_when_table_changes(self):
+        from app.models import Geolocation
+
+        Geolocation.objects.create(geolocation_zip_code_prefix="01001", geolocation_lat=-23.5, geolocation_lng=-46.6,
+                                   geolocation_city="sao paulo", geolocation_state="SP")
+        self.assertIsNotNone(get_geocoder().lookup("01001"))
+        Geolocation.objects.create(geolocation_zip_code_prefix="20040", geolocation_lat=-22.9, geolocation_lng=-43.2,
+                                   geolocation_city="rio de janeiro", geolocation_state="RJ")
+        self.assertEqual(get_geocoder().lookup("20040")["city"], "rio de janeiro")
+        with self.assertNumQueries(0):
+            get_geocoder()
+
+    def test_endpoints(self):
+        from app.models import Geolocation
+
+        Geolocation.objects.create(geolocation_zip_code_prefix="01001", geolocation_lat=-23.5, geolocation_lng=-46.6)
+        self.assertEqual(self.client.get(reverse("geocode", args=["01001"])).status_code, 200)
+        self.assertEqual(self.client.get(reverse("geocode", args=["99999"])).status_code, 404)
+        results = self.client.get(reverse("geocode-batch"), {"zip": ["01001", "99999"]}).json()["results"]
+        self.assertEqual([r["found"] for r in results], [True, False])
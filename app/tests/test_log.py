@@ -0,0 +1,60 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import tempfile
+import unittest
+
+from django.test import SimpleTestCase
+
+from app import log
+from app.log import JsonFormatter, RowErrorAggregator
+
+
+class TestStructuredLogging(SimpleTestCase):
+    def test_row_errors_are_aggregated(self):
+        logger = logging.getLogger("app.tests.import")
+        errors = RowErrorAggregator(logger, sample_size=2)
+        for row_id in range(1000):
+            errors.add("customer", row_id, ValueError(f"bad zip for {row_id}"))
+        errors.add("customer", "x", KeyError("address"))
+
+        with self.assertLogs(logger, level="ERROR") as logs:
+            errors.flush()
+        self.assertEqual(len(logs.records), 2)
+        record = logs.records[0]
+        self.assertEqual(record.count, 1000)
+        self.assertEqual(record.sample_row_ids, ["0", "1"])
+        self.assertEqual(errors.errors, {})
+
+    def test_json_formatter_includes_extra_fields(self):
+        record = logging.LogRecord("app", logging.ERROR, __file__, 1, "%s rows skipped", (3,), None)
+        record.table = "seller"
+        payload = json.loads(JsonFormatter().format(record))
+        self.assertEqual(payload["message"], "3 rows skipped")
+        self.assertEqual(payload["table"], "seller")
+        self.assertEqual(payload["level"], "ERROR")
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+    def test_queue_listener_restarts_in_forked_child(self):
+        with tempfile.NamedTemporaryFile(mode="r", suffix=".log") as output:
+            target = logging.FileHandler(output.name)
+            handler = logging.handlers.QueueHandler(queue.Queue())
+            handler.listener = logging.handlers.QueueListener(handler.queue, target)
+            root = logging.getLogger()
+            root.addHandler(handler)
+            try:
+                log.start_queue_listeners()
+                pid = os.fork()
+                if pid == 0:
+                    handler.handle(logging.LogRecord("app", logging.INFO, __file__, 1, "from child", (), None))
+                    handler.listener.stop()
+                    os._exit(0)
+                os.waitpid(pid, 0)
+                self.assertEqual(output.read().strip(), "from child")
+            finally:
+                root.removeHandler(handler)
+                handler.listener.stop()
+                log._started.remove((handler, handler.listener))
+                target.close()
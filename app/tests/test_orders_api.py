@@ -0,0 +1,108 @@
+import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import Order, OrderItem, Payment, Review
+from app.tests.fixtures import make_category, make_customer, make_product, make_seller
+
+
+class TestOrdersApi(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        customer = make_customer()
+        seller = make_seller()
+        product = make_product(make_category())
+        start = timezone.make_aware(datetime.datetime(2018, 1, 1))
+        cls.orders = []
+        for i in range(7):
+            # two orders share each timestamp so the order_id tie-break is exercised
+            order = Order.objects.create(
+                customer=customer, order_status="delivered",
+                order_purchase_timestamp=start + datetime.timedelta(days=i // 2),
+            )
+            OrderItem.objects.create(
+                order=order, product=product, seller=seller, order_item_sequence_number=1,
+                order_item_price=Decimal("10.00"), order_item_freight_value=Decimal("1.50"),
+            )
+            Payment.objects.create(
+                order=order, payment_type="boleto", payment_sequential=1,
+                payment_timestamp=order.order_purchase_timestamp, payment_value=Decimal("11.50"),
+            )
+            Review.objects.create(
+                order=order, review_score=5, review_comment_title="", review_comment_message="",
+                review_creation_date=order.order_purchase_timestamp,
+            )
+            cls.orders.append(order)
+
+    def test_keyset_pages_cover_every_order_once(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            # page + order_items + payments + reviews, whatever the page depth
+            with self.assertNumQueries(4):
+                response = self.client.get(reverse("order-list"), params)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            seen.extend(row["order_id"] for row in body["results"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        expected = sorted(self.orders, key=lambda o: (o.order_purchase_timestamp, o.order_id))
+        self.assertEqual(seen, [str(o.order_id) for o in expected])
+
+    def test_nested_children(self):
+        body = self.client.get(reverse("order-list"), {"limit": 1}).json()
+        row = body["results"][0]
+        self.assertEqual(len(row["order_items"]), 1)
+        self.assertEqual(row["payments"][0]["payment_value"], "11.50")
+        self.assertEqual(row["reviews"][0]["review_score"], 5)
+
+    def test_children_are_ordered(self):
+        order = self.orders[0]
+        item = order.order_items.get()
+        # inserted after sequence number 1, listed before it
+        OrderItem.objects.create(
+            order=order, product=item.product, seller=item.seller, order_item_sequence_number=0,
+            order_item_price=Decimal("1.00"), order_item_freight_value=Decimal("0.00"),
+        )
+        Payment.objects.create(
+            order=order, payment_type="voucher", payment_sequential=0,
+            payment_timestamp=order.order_purchase_timestamp, payment_value=Decimal("1.00"),
+        )
+        body = self.client.get(reverse("order-detail", args=[order.order_id])).json()
+        self.assertEqual([i["order_item_sequence_number"] for i in body["order_items"]], [0, 1])
+        self.assertEqual([p["payment_sequential"] for p in body["payments"]], [0, 1])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("order-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail(self):
+        order = self.orders[0]
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("order-detail", args=[order.order_id]))
+        self.assertEqual(response.json()["order_id"], str(order.order_id))
+
+    async def test_tracking_conditional_get(self):
+        url = reverse("order-tracking", args=[self.orders[0].order_id])
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["order_status"], "delivered")
+        etag = response["ETag"]
+
+        response = await self.async_client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        response = await self.async_client.get(url, headers={"If-None-Match": f"W/{etag}"})
+        self.assertEqual(response.status_code, 304)
+
+        await Order.objects.filter(pk=self.orders[0].pk).aupdate(order_status="canceled")
+        response = await self.async_client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from app import cache as catalog_cache
+from app.middleware import UNRESOLVED_VIEW
+from app.models import Category
+from app.profiling import QueryBudgetExceeded, fingerprint, query_budget, stats
+
+
+class TestFingerprint(TestCase):
+    def test_parameters_are_normalized(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "order_item" WHERE "order_item"."order_id" = %s'),
+            fingerprint("SELECT * FROM \"order_item\" WHERE \"order_item\".\"order_id\" = 'abc'"),
+        )
+        self.assertEqual(fingerprint("SELECT 1 WHERE id IN (%s, %s, %s)"), "SELECT ? WHERE id IN (...)")
+
+
+class TestQueryBudget(TestCase):
+    def setUp(self):
+        for name in ("a", "b", "c"):
+            Category.objects.create(product_category_name=name)
+
+    def test_n_plus_one_is_reported(self):
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            with query_budget(100, n_plus_one_threshold=3):
+                for pk in Category.objects.values_list("pk", flat=True):
+                    Category.objects.get(pk=pk)
+        self.assertIn("possible N+1, 3x", str(raised.exception))
+
+    def test_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(1):
+                list(Category.objects.all())
+                list(Category.objects.all())
+        with query_budget(1):
+            list(Category.objects.all())
+
+    def test_order_api_within_budget(self):
+        with query_budget(4, n_plus_one_threshold=2):
+            self.client.get(reverse("order-list"))
+
+
+@override_settings(DEBUG=True, QUERY_PROFILING_SAMPLE_RATE=1.0)
+class TestQueryProfilingMiddleware(TestCase):
+    def test_headers_and_stats(self):
+        stats.reset()
+        response = self.client.get(reverse("category-tree"))
+        self.assertIn("X-Query-Count", response)
+        self.assertIn("category-tree", stats.snapshot())
+
+        staff = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(staff)
+        self.assertIn("views", self.client.get(reverse("profiling-stats")).json())
+
+    async def test_async_request(self):
+        stats.reset()
+        catalog_cache.get_cache().clear()
+        # a sync view and an async view, both reached through the async handler
+        response = await self.async_client.get(reverse("category-tree"))
+        self.assertGreater(int(response["X-Query-Count"]), 0)
+        response = await self.async_client.get(reverse("order-tracking", args=["e481f51cbdc54678b7cc49136f2d6af7"]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response["X-Query-Count"], "1")
+        snapshot = stats.snapshot()
+        self.assertGreater(snapshot["category-tree"]["avg_queries"], 0)
+        self.assertEqual(snapshot["order-tracking"]["avg_queries"], 1)
+
+    def test_unresolved_paths_share_one_entry(self):
+        stats.reset()
+        for path in ("/wp-login.php", "/.env", "/admin.php"):
+            self.assertEqual(self.client.get(path).status_code, 404)
+        self.assertEqual(list(stats.snapshot()), [UNRESOLVED_VIEW])
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from app import routers
+from app.middleware import PRIMARY_PIN_COOKIE, ReplicaPinningMiddleware
+from app.models import Order
+
+
+class TestPrimaryReplicaRouter(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        self.token = routers.start_request()
+        self.addCleanup(routers.end_request, self.token)
+        patcher = mock.patch("app.routers.replica_aliases", return_value=["replica_0", "replica_1"])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_go_to_healthy_replicas(self):
+        with mock.patch("app.routers.replica_lag", side_effect=lambda alias: 0 if alias == "replica_1" else 120):
+            self.assertEqual(self.router.db_for_read(Order), "replica_1")
+
+    def test_all_replicas_lagging_falls_back_to_primary(self):
+        with mock.patch("app.routers.replica_lag", return_value=float("inf")):
+            self.assertEqual(self.router.db_for_read(Order), "default")
+
+    def test_reads_after_a_write_are_pinned(self):
+        with mock.patch("app.routers.replica_lag", return_value=0):
+            self.assertEqual(self.router.db_for_write(Order), "default")
+            self.assertEqual(self.router.db_for_read(Order), "default")
+
+    def test_use_primary(self):
+        with mock.patch("app.routers.replica_lag", return_value=0):
+            with routers.use_primary():
+                self.assertEqual(self.router.db_for_read(Order), "default")
+            self.assertTrue(self.router.db_for_read(Order).startswith("replica"))
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate("default", "app"))
+        self.assertFalse(self.router.allow_migrate("replica_0", "app"))
+
+
+class TestRouterTransactions(TestCase):
+    def test_reads_inside_transactions_stay_on_primary(self):
+        token = routers.start_request()
+        self.addCleanup(routers.end_request, token)
+        with mock.patch("app.routers.replica_aliases", return_value=["replica_0"]), \
+                mock.patch("app.routers.replica_lag", return_value=0), \
+                transaction.atomic():
+            self.assertEqual(routers.PrimaryReplicaRouter().db_for_read(Order), "default")
+
+
+class TestReplicaPinningMiddleware(SimpleTestCase):
+    async def test_async_mode_pins_after_a_write(self):
+        async def get_response(request):
+            routers.PrimaryReplicaRouter().db_for_write(Order)
+            return HttpResponse()
+
+        middleware = ReplicaPinningMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().post("/"))
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+    def test_sync_mode_does_not_pin_reads(self):
+        middleware = ReplicaPinningMiddleware(lambda request: HttpResponse())
+        self.assertFalse(iscoroutinefunction(middleware))
+        self.assertNotIn(PRIMARY_PIN_COOKIE, middleware(RequestFactory().get("/")).cookies)
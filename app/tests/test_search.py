@@ -0,0 +1,53 @@
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import Order, Review
+from app.search import search_reviews
+from app.tests.fixtures import make_customer
+
+
+class TestReviewSearch(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        customer = make_customer()
+        cls.when = timezone.make_aware(datetime.datetime(2018, 3, 1))
+        order = Order.objects.create(customer=customer, order_purchase_timestamp=cls.when)
+        cls.late = Review.objects.create(
+            order=order, review_score=1, review_comment_title="Atraso",
+            review_comment_message="O produto chegou com muito atraso.", review_creation_date=cls.when,
+        )
+        cls.broken = Review.objects.create(
+            order=order, review_score=2, review_comment_title="",
+            review_comment_message="Veio com defeito e também atrasado.", review_creation_date=cls.when,
+        )
+        cls.happy = Review.objects.create(
+            order=order, review_score=5, review_comment_title="Ótimo",
+            review_comment_message="Chegou antes do prazo, recomendo.", review_creation_date=cls.when,
+        )
+
+    def test_stemmed_match_and_ranking(self):
+        results = search_reviews("atrasos")
+        self.assertEqual([r["review_id"] for r in results][:1], [self.late.pk])
+        self.assertIn("<mark>", results[0]["message_headline"])
+
+    def test_filters(self):
+        self.assertEqual([r["review_id"] for r in search_reviews("defeito", score=2)], [self.broken.pk])
+        self.assertEqual(search_reviews("defeito", score=5), [])
+        self.assertEqual(search_reviews("defeito", since=self.when + datetime.timedelta(days=1)), [])
+
+    def test_vector_follows_edits_and_bulk_updates(self):
+        self.happy.review_comment_message = "Produto com defeito"
+        self.happy.save()
+        self.assertIn(self.happy.pk, [r["review_id"] for r in search_reviews("defeito")])
+
+        Review.objects.filter(pk=self.happy.pk).update(review_comment_message="Chegou antes do prazo")
+        self.assertNotIn(self.happy.pk, [r["review_id"] for r in search_reviews("defeito")])
+
+    def test_endpoint(self):
+        response = self.client.get(reverse("review-search"), {"q": "atraso", "score": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+        self.assertEqual(self.client.get(reverse("review-search")).status_code, 400)
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+HEAVY = ("pandas", "numpy", "tqdm", "faker")
+
+
+class TestStartupImports(SimpleTestCase):
+    def imported_heavy_modules(self, code):
+        # a fresh interpreter: the test process itself already has everything imported
+        result = subprocess.run(
+            [sys.executable, "-c", f"import django, sys; django.setup(); {code}; "
+                                   f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+        return result.stdout.strip()
+
+    def test_app_loading_skips_data_libraries(self):
+        self.assertEqual(self.imported_heavy_modules("pass"), "")
+
+    def test_load_data_raw_command_imports_them_lazily(self):
+        code = "from django.core.management import load_command_class; load_command_class('app', 'load_data_raw')"
+        self.assertEqual(self.imported_heavy_modules(code), "")
+
+    def test_check_command_skips_data_libraries(self):
+        # system checks import the URLconf, hence every view module
+        code = "from django.core.management import call_command; call_command('check', verbosity=0)"
+        self.assertEqual(self.imported_heavy_modules(code), "")
@@ -0,0 +1,125 @@
+import datetime
+import os
+from decimal import Decimal
+
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+
+from app import timeseries
+from app.models import Order, OrderItem, OrderTimeBucket, Payment
+from app.tests.fixtures import make_category, make_customer, make_product, make_seller
+
+UTC = datetime.timezone.utc
+
+
+class TestOrderTimeSeries(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = make_customer()
+        cls.seller = make_seller()
+        cls.product = make_product(make_category())
+        # Jan 31 23:30, Feb 1 10:15 (x2), Feb 3 08:00, Mar 2 12:45
+        for moment in [(1, 31, 23, 30), (2, 1, 10, 15), (2, 1, 10, 15), (2, 3, 8, 0), (3, 2, 12, 45)]:
+            cls.add_order(datetime.datetime(2018, *moment, tzinfo=UTC))
+        timeseries.refresh_buckets()
+
+    @classmethod
+    def add_order(cls, purchased_at, price=Decimal("10.00")):
+        order = Order.objects.create(customer=cls.customer, order_status="delivered", order_purchase_timestamp=purchased_at)
+        OrderItem.objects.create(
+            order=order, product=cls.product, seller=cls.seller, order_item_sequence_number=1,
+            order_item_price=price, order_item_freight_value=Decimal("1.50"),
+        )
+        Payment.objects.create(order=order, payment_type="boleto", payment_sequential=1,
+                               payment_timestamp=purchased_at, payment_value=price + Decimal("1.50"))
+        return order
+
+    def raw_totals(self, start, end):
+        orders = Order.objects.filter(order_purchase_timestamp__gte=start, order_purchase_timestamp__lt=end)
+        items = OrderItem.objects.filter(order__in=orders)
+        return {
+            "order_count": orders.count(),
+            "item_count": items.count(),
+            "item_revenue": items.aggregate(total=Sum("order_item_price"))["total"] or Decimal("0"),
+            "freight_revenue": items.aggregate(total=Sum("order_item_freight_value"))["total"] or Decimal("0"),
+            "payment_value": Payment.objects.filter(order__in=orders).aggregate(
+                total=Sum("payment_value"))["total"] or Decimal("0"),
+        }
+
+    def test_buckets_per_granularity(self):
+        months = OrderTimeBucket.objects.filter(granularity="month").order_by("bucket_start")
+        self.assertEqual([b.order_count for b in months], [1, 3, 1])
+        self.assertEqual(months[1].item_revenue, Decimal("30.00"))
+        self.assertEqual(months[1].payment_value, Decimal("34.50"))
+        hour = OrderTimeBucket.objects.get(granularity="hour", bucket_start=datetime.datetime(2018, 2, 1, 10, tzinfo=UTC))
+        self.assertEqual(hour.order_count, 2)
+
+    def test_series_is_gap_filled(self):
+        points = timeseries.series(
+            datetime.datetime(2018, 2, 1, tzinfo=UTC), datetime.datetime(2018, 2, 4, tzinfo=UTC), "day",
+        )
+        self.assertEqual([p["order_count"] for p in points], [2, 0, 1])
+        self.assertEqual(points[1]["bucket_start"], datetime.datetime(2018, 2, 2, tzinfo=UTC))
+
+    def test_totals_match_raw_aggregates(self):
+        for start, end in [
+            (datetime.datetime(2018, 1, 31, 23, tzinfo=UTC), datetime.datetime(2018, 3, 2, 13, tzinfo=UTC)),
+            (datetime.datetime(2018, 1, 1, tzinfo=UTC), datetime.datetime(2018, 4, 1, tzinfo=UTC)),
+            (datetime.datetime(2018, 2, 1, 11, tzinfo=UTC), datetime.datetime(2018, 3, 2, 12, tzinfo=UTC)),
+        ]:
+            self.assertEqual(timeseries.totals(start, end), self.raw_totals(start, end))
+
+    def test_decompose_uses_coarse_buckets(self):
+        pieces = timeseries.decompose(
+            datetime.datetime(2018, 1, 31, 22, tzinfo=UTC), datetime.datetime(2018, 3, 2, 1, tzinfo=UTC),
+        )
+        self.assertEqual(pieces, [
+            ("hour", datetime.datetime(2018, 1, 31, 22, tzinfo=UTC)),
+            ("hour", datetime.datetime(2018, 1, 31, 23, tzinfo=UTC)),
+            ("month", datetime.datetime(2018, 2, 1, tzinfo=UTC)),
+            ("day", datetime.datetime(2018, 3, 1, tzinfo=UTC)),
+            ("hour", datetime.datetime(2018, 3, 2, tzinfo=UTC)),
+        ])
+
+    def test_incremental_refresh(self):
+        purchased_at = datetime.datetime(2018, 2, 3, 9, 5, tzinfo=UTC)
+        self.add_order(purchased_at, price=Decimal("5.00"))
+        untouched = OrderTimeBucket.objects.get(granularity="day", bucket_start=datetime.datetime(2018, 3, 2, tzinfo=UTC))
+        timeseries.refresh_buckets(purchased_at, purchased_at + datetime.timedelta(microseconds=1))
+
+        day = OrderTimeBucket.objects.get(granularity="day", bucket_start=datetime.datetime(2018, 2, 3, tzinfo=UTC))
+        self.assertEqual((day.order_count, day.item_revenue), (2, Decimal("15.00")))
+        self.assertEqual(OrderTimeBucket.objects.get(pk=untouched.pk).updated_at, untouched.updated_at)
+        start, end = datetime.datetime(2018, 1, 1, tzinfo=UTC), datetime.datetime(2018, 4, 1, tzinfo=UTC)
+        self.assertEqual(timeseries.totals(start, end), self.raw_totals(start, end))
+
+    def test_rebuild_command_with_mixed_bounds(self):
+        OrderTimeBucket.objects.all().delete()
+        call_command("rebuild_timeseries", start="2018-02-01", end="2018-02-02T00:00:00Z",
+                     granularities=["day"], stdout=open(os.devnull, "w"))
+        day = OrderTimeBucket.objects.get(granularity="day")
+        self.assertEqual((day.bucket_start, day.order_count), (datetime.datetime(2018, 2, 1, tzinfo=UTC), 2))
+        with self.assertRaises(CommandError):
+            call_command("rebuild_timeseries", start="2018-02-02", end="2018-02-01T00:00:00Z")
+
+    def test_api(self):
+        response = self.client.get(reverse("timeseries-orders"),
+                                   {"granularity": "month", "start": "2018-01-01", "end": "2018-04-01"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["order_count"] for p in response.json()["points"]], [1, 3, 1])
+
+        response = self.client.get(reverse("timeseries-totals"), {"start": "2018-01-01", "end": "2018-04-01"})
+        self.assertEqual(response.json()["order_count"], 5)
+
+        # naive date and aware datetime mixed; the range is widened to whole hours
+        response = self.client.get(reverse("timeseries-totals"), {"start": "2018-02-01", "end": "2018-02-01T10:30:00Z"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["end"], "2018-02-01T11:00:00Z")
+        self.assertEqual(response.json()["order_count"], 2)
+
+        response = self.client.get(reverse("timeseries-orders"), {"granularity": "year", "start": "2018-01-01", "end": "2018-04-01"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse("timeseries-orders"), {"granularity": "hour", "start": "2000-01-01", "end": "2018-04-01"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,183 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import Trunc
+
+from app.models import Order, OrderItem, OrderTimeBucket, Payment
+
+UTC = datetime.timezone.utc
+GRANULARITIES = ("hour", "day", "week", "month")
+# granularities that nest exactly, coarsest first (weeks straddle months, so they are not used to combine)
+NESTED_GRANULARITIES = ("month", "day", "hour")
+METRICS = ("order_count", "item_count", "item_revenue", "freight_revenue", "payment_value")
+MAX_POINTS = 10_000
+
+
+def to_utc(value):
+    """Aware UTC datetime; naive values are read as UTC, like the bucket boundaries."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def floor(value, granularity):
+    value = to_utc(value).replace(minute=0, second=0, microsecond=0)
+    if granularity == "hour":
+        return value
+    value = value.replace(hour=0)
+    if granularity == "day":
+        return value
+    if granularity == "week":
+        return value - datetime.timedelta(days=value.weekday())
+    return value.replace(day=1)
+
+
+def step(value, granularity):
+    if granularity == "hour":
+        return value + datetime.timedelta(hours=1)
+    if granularity == "day":
+        return value + datetime.timedelta(days=1)
+    if granularity == "week":
+        return value + datetime.timedelta(weeks=1)
+    return (value.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+
+
+def ceil(value, granularity):
+    floored = floor(value, granularity)
+    return floored if floored == to_utc(value) else step(floored, granularity)
+
+
+def _empty():
+    return {metric: 0 if metric.endswith("count") else Decimal("0") for metric in METRICS}
+
+
+def compute_buckets(granularity, start, end):
+    """Aggregate [start, end) from the OLTP tables: {bucket_start: metrics}."""
+    buckets = defaultdict(_empty)
+    ts = "order_purchase_timestamp"
+
+    orders = (
+        Order.objects.filter(**{f"{ts}__gte": start, f"{ts}__lt": end})
+        .annotate(bucket=Trunc(ts, granularity, tzinfo=UTC))
+        .values("bucket").annotate(order_count=Count("pk")).order_by()
+    )
+    for row in orders:
+        buckets[row["bucket"]]["order_count"] = row["order_count"]
+
+    items = (
+        OrderItem.objects.filter(**{f"order__{ts}__gte": start, f"order__{ts}__lt": end})
+        .annotate(bucket=Trunc(f"order__{ts}", granularity, tzinfo=UTC))
+        .values("bucket")
+        .annotate(
+            item_count=Count("pk"),
+            item_revenue=Sum("order_item_price"),
+            freight_revenue=Sum("order_item_freight_value"),
+        ).order_by()
+    )
+    for row in items:
+        bucket = buckets[row["bucket"]]
+        bucket["item_count"] = row["item_count"]
+        bucket["item_revenue"] = row["item_revenue"] or Decimal("0")
+        bucket["freight_revenue"] = row["freight_revenue"] or Decimal("0")
+
+    payments = (
+        Payment.objects.filter(**{f"order__{ts}__gte": start, f"order__{ts}__lt": end})
+        .annotate(bucket=Trunc(f"order__{ts}", granularity, tzinfo=UTC))
+        .values("bucket").annotate(payment_value=Sum("payment_value")).order_by()
+    )
+    for row in payments:
+        buckets[row["bucket"]]["payment_value"] = row["payment_value"] or Decimal("0")
+    return buckets
+
+
+def refresh_buckets(start=None, end=None, granularities=GRANULARITIES):
+    """
+    Recompute every bucket overlapping [start, end) at each granularity (the whole history
+    when no range is given). Buckets are recomputed rather than incremented, so refreshing
+    the same range twice, e.g. after a re-import, is harmless.
+    """
+    if start is None or end is None:
+        bounds = Order.objects.aggregate(first=Min("order_purchase_timestamp"), last=Max("order_purchase_timestamp"))
+        if bounds["first"] is None:
+            with transaction.atomic():
+                OrderTimeBucket.objects.filter(granularity__in=granularities).delete()
+            return 0
+        start = start or bounds["first"]
+        end = end or bounds["last"] + datetime.timedelta(microseconds=1)
+
+    written = 0
+    with transaction.atomic():
+        for granularity in granularities:
+            lo, hi = floor(start, granularity), ceil(end, granularity)
+            buckets = compute_buckets(granularity, lo, hi)
+            OrderTimeBucket.objects.filter(
+                granularity=granularity, bucket_start__gte=lo, bucket_start__lt=hi,
+            ).exclude(bucket_start__in=list(buckets)).delete()
+            OrderTimeBucket.objects.bulk_create(
+                [OrderTimeBucket(granularity=granularity, bucket_start=bucket_start, **metrics)
+                 for bucket_start, metrics in buckets.items()],
+                update_conflicts=True,
+                unique_fields=["granularity", "bucket_start"],
+                update_fields=[*METRICS, "updated_at"],
+                batch_size=1000,
+            )
+            written += len(buckets)
+    return written
+
+
+def series(start, end, granularity):
+    """Gap-filled points for every ``granularity`` bucket between start and end."""
+    lo, hi = floor(start, granularity), ceil(end, granularity)
+    stored = {
+        row["bucket_start"]: row
+        for row in OrderTimeBucket.objects.filter(
+            granularity=granularity, bucket_start__gte=lo, bucket_start__lt=hi,
+        ).values("bucket_start", *METRICS)
+    }
+    points = []
+    cursor = lo
+    while cursor < hi:
+        if len(points) >= MAX_POINTS:
+            raise ValueError(f"More than {MAX_POINTS} {granularity} buckets requested")
+        points.append(stored.get(cursor) or {"bucket_start": cursor, **_empty()})
+        cursor = step(cursor, granularity)
+    return points
+
+
+def decompose(start, end):
+    """
+    Cover [start, end) with as few stored buckets as possible: whole months, then whole days,
+    then hours at the edges. Bounds are rounded outwards to the hour.
+    """
+    cursor, end = floor(start, "hour"), ceil(end, "hour")
+    pieces = []
+    while cursor < end:
+        for granularity in NESTED_GRANULARITIES:
+            following = step(cursor, granularity)
+            if floor(cursor, granularity) == cursor and following <= end:
+                pieces.append((granularity, cursor))
+                cursor = following
+                break
+    return pieces
+
+
+def totals(start, end):
+    """Metric totals over an arbitrary range, answered from pre-aggregated buckets in one query."""
+    pieces = decompose(start, end)
+    wanted = defaultdict(list)
+    for granularity, bucket_start in pieces:
+        wanted[granularity].append(bucket_start)
+    query = Q()
+    for granularity, starts in wanted.items():
+        query |= Q(granularity=granularity, bucket_start__in=starts)
+    result = _empty()
+    if not pieces:
+        return result
+    sums = OrderTimeBucket.objects.filter(query).aggregate(**{metric: Sum(metric) for metric in METRICS})
+    for metric in METRICS:
+        if sums[metric] is not None:
+            result[metric] = sums[metric]
+    return result
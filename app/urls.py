@@ -0,0 +1,22 @@
+from django.urls import path
+
+from app import views
+
+urlpatterns = [
+    path('categories/tree/', views.category_tree, name='category-tree'),
+    path('categories/<int:category_id>/products/', views.category_products, name='category-products'),
+    path('products/<uuid:product_id>/', views.product_detail, name='product-detail'),
+    path('orders/', views.order_list, name='order-list'),
+    path('orders/<uuid:order_id>/', views.order_detail, name='order-detail'),
+    path('orders/<uuid:order_id>/tracking/', views.order_tracking, name='order-tracking'),
+    path('reviews/search/', views.review_search, name='review-search'),
+    path('geocode/', views.geocode_batch, name='geocode-batch'),
+    path('geocode/<str:prefix>/', views.geocode, name='geocode'),
+    path('carts/<uuid:cart_id>/items/', views.cart_items, name='cart-items'),
+    path('carts/<uuid:cart_id>/items/batch/', views.cart_items_batch, name='cart-items-batch'),
+    path('carts/<uuid:cart_id>/items/<uuid:product_id>/', views.cart_item, name='cart-item'),
+    path('timeseries/orders/', views.timeseries_orders, name='timeseries-orders'),
+    path('timeseries/orders/totals/', views.timeseries_totals, name='timeseries-totals'),
+    path('exports/<slug:dataset>.<slug:fmt>', views.export_dataset, name='export-dataset'),
+    path('_profiling/', views.profiling_stats, name='profiling-stats'),
+]
@@ -1,3 +1,272 @@
-from django.shortcuts import render
+import json
+from decimal import Decimal
+
+from django.db import IntegrityError
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+
+from app import cache as catalog_cache
+from app import carts, exports, orders, profiling, search, timeseries
+from app.categories import get_category_tree
+from app.models import Order
 
 # Create your views here.
+
+CATEGORY_PRODUCTS_PAGE_SIZE = 100
+
+
+@require_GET
+def category_tree(request):
+    return JsonResponse({"categories": get_category_tree()})
+
+
+@require_GET
+def category_products(request, category_id):
+    category = catalog_cache.get_category(category_id)
+    if category is None:
+        raise Http404("Category not found")
+    return JsonResponse(catalog_cache.get_category_products(category, CATEGORY_PRODUCTS_PAGE_SIZE))
+
+
+@require_GET
+def product_detail(request, product_id):
+    product = catalog_cache.get_product(product_id)
+    if product is None:
+        raise Http404("Product not found")
+    category = catalog_cache.get_category(product.category_id)
+    return JsonResponse({
+        "product_id": product.product_id,
+        "category_id": product.category_id,
+        "category_name": category.product_category_name,
+        "category_name_english": category.product_category_name_english,
+        "product_photo": product.product_photo,
+        "product_weight_g": product.product_weight_g,
+        "product_length_cm": product.product_length_cm,
+        "product_height_cm": product.product_height_cm,
+        "product_width_cm": product.product_width_cm,
+    })
+
+
+@require_GET
+def order_list(request):
+    try:
+        limit = min(int(request.GET.get("limit", orders.DEFAULT_PAGE_SIZE)), orders.MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=400)
+    if limit < 1:
+        return JsonResponse({"error": "limit must be positive"}, status=400)
+    try:
+        rows, next_cursor = orders.order_page(request.GET.get("cursor"), limit)
+    except orders.InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse({"next_cursor": next_cursor, "results": rows})
+
+
+@require_GET
+def order_detail(request, order_id):
+    order = orders.order_detail(order_id)
+    if order is None:
+        raise Http404("Order not found")
+    return JsonResponse(order)
+
+
+@require_GET
+async def order_tracking(request, order_id):
+    row = await Order.objects.filter(pk=order_id).values(*orders.TRACKING_FIELDS).afirst()
+    if row is None:
+        raise Http404("Order not found")
+    etag = orders.tracking_etag(row)
+    # weak comparison, as RFC 9110 requires for If-None-Match (proxies that compress turn the tag into W/"...")
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(row)
+    response["ETag"] = etag
+    # clients must revalidate on every poll, which is what makes the 304 path cheap
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+def _json_body(request):
+    try:
+        body = json.loads(request.body or b"{}", parse_float=Decimal)
+    except ValueError:
+        raise carts.CartError("Request body must be valid JSON")
+    if not isinstance(body, dict):
+        raise carts.CartError("Request body must be a JSON object")
+    return body
+
+
+def _cart_response(cart_id, apply):
+    try:
+        total = apply()
+    except carts.CartNotFound as e:
+        return JsonResponse({"error": str(e)}, status=404)
+    except carts.CartError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except IntegrityError:
+        return JsonResponse({"error": "Unknown product"}, status=400)
+    return JsonResponse({"cart_id": cart_id, "cart_total_amount": total})
+
+
+@csrf_exempt
+@require_POST
+def cart_items(request, cart_id):
+    def apply():
+        body = _json_body(request)
+        return carts.add_item(cart_id, body.get("product_id"), body.get("quantity"), body.get("unit_price"))
+    return _cart_response(cart_id, apply)
+
+
+@csrf_exempt
+@require_http_methods(["PATCH", "DELETE"])
+def cart_item(request, cart_id, product_id):
+    def apply():
+        if request.method == "DELETE":
+            return carts.remove_item(cart_id, product_id)
+        body = _json_body(request)
+        return carts.update_item(cart_id, product_id, body.get("quantity"), body.get("unit_price"))
+    return _cart_response(cart_id, apply)
+
+
+@csrf_exempt
+@require_POST
+def cart_items_batch(request, cart_id):
+    def apply():
+        changes = _json_body(request).get("changes")
+        if not isinstance(changes, list) or not all(isinstance(change, dict) for change in changes):
+            raise carts.CartError("changes must be a list of objects")
+        return carts.apply_changes(cart_id, changes)
+    return _cart_response(cart_id, apply)
+
+
+def _parse_bound(value):
+    return parse_datetime(value) or parse_datetime(f"{value}T00:00:00")
+
+
+@require_GET
+def review_search(request):
+    text = request.GET.get("q", "").strip()
+    if not text:
+        return JsonResponse({"error": "q is required"}, status=400)
+    try:
+        score = int(request.GET["score"]) if request.GET.get("score") else None
+        limit = int(request.GET.get("limit", search.DEFAULT_LIMIT))
+    except ValueError:
+        return JsonResponse({"error": "score and limit must be integers"}, status=400)
+    bounds = {}
+    for name in ("since", "until"):
+        value = request.GET.get(name)
+        if value:
+            bounds[name] = _parse_bound(value)
+            if bounds[name] is None:
+                return JsonResponse({"error": f"{name} must be an ISO date or datetime"}, status=400)
+    try:
+        results = search.search_reviews(text, score=score, limit=max(limit, 1), **bounds)
+    except search.SearchTimeout as e:
+        return JsonResponse({"error": str(e)}, status=503)
+    return JsonResponse({"results": results})
+
+
+@staff_member_required
+@require_GET
+def profiling_stats(request):
+    return JsonResponse({"views": profiling.stats.snapshot()})
+
+
+@require_GET
+def geocode(request, prefix):
+    # imported here: the URLconf is loaded by system checks, which should not pull in NumPy
+    from app.geocoder import get_geocoder
+
+    location = get_geocoder().lookup(prefix)
+    if location is None:
+        raise Http404("Unknown zip code prefix")
+    return JsonResponse(location)
+
+
+@require_GET
+def geocode_batch(request):
+    from app.geocoder import get_geocoder
+
+    prefixes = request.GET.getlist("zip")[:1000]
+    result = get_geocoder().geocode(prefixes)
+    return JsonResponse({"results": [
+        {
+            "zip_code_prefix": prefix,
+            "found": bool(result["found"][i]),
+            "lat": float(result["lat"][i]) if result["found"][i] else None,
+            "lng": float(result["lng"][i]) if result["found"][i] else None,
+            "city": str(result["city"][i]),
+            "state": str(result["state"][i]),
+        }
+        for i, prefix in enumerate(prefixes)
+    ]})
+
+
+@require_GET
+def export_dataset(request, dataset, fmt):
+    if dataset not in exports.DATASETS or fmt not in exports.ENCODERS:
+        raise Http404("Unknown export")
+    bounds = {}
+    for name in ("start", "end"):
+        value = request.GET.get(name)
+        if value:
+            bounds[name] = _parse_bound(value)
+            if bounds[name] is None:
+                return JsonResponse({"error": f"{name} must be an ISO date or datetime"}, status=400)
+    state = request.GET.get("state", "").upper() or None
+
+    queryset, columns = exports.export_queryset(dataset, state=state, **bounds)
+    encoder = exports.ENCODERS[fmt](columns)
+    # under ASGI a sync iterator would be drained into memory before the first byte is sent
+    chunks = exports.astream(queryset, encoder) if isinstance(request, ASGIRequest) else exports.stream(queryset, encoder)
+    response = StreamingHttpResponse(chunks, content_type=encoder.content_type)
+    response["Content-Disposition"] = f'attachment; filename="{dataset}-{now():%Y%m%d%H%M%S}.{encoder.extension}"'
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _time_range(request):
+    bounds = {}
+    for name in ("start", "end"):
+        value = request.GET.get(name)
+        if not value:
+            raise ValueError(f"{name} is required")
+        bounds[name] = _parse_bound(value)
+        if bounds[name] is None:
+            raise ValueError(f"{name} must be an ISO date or datetime")
+        # dates parse naive and "...Z" aware: both are read as UTC
+        bounds[name] = timeseries.to_utc(bounds[name])
+    if bounds["start"] >= bounds["end"]:
+        raise ValueError("start must be before end")
+    return bounds["start"], bounds["end"]
+
+
+@require_GET
+def timeseries_orders(request):
+    granularity = request.GET.get("granularity", "day")
+    if granularity not in timeseries.GRANULARITIES:
+        return JsonResponse({"error": f"granularity must be one of {', '.join(timeseries.GRANULARITIES)}"}, status=400)
+    try:
+        start, end = _time_range(request)
+        points = timeseries.series(start, end, granularity)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse({"granularity": granularity, "points": points})
+
+
+@require_GET
+def timeseries_totals(request):
+    try:
+        start, end = _time_range(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    # totals() rounds the range outwards to whole hours: report the range actually summed
+    start, end = timeseries.floor(start, "hour"), timeseries.ceil(end, "hour")
+    return JsonResponse({"start": start, "end": end, **timeseries.totals(start, end)})
@@ -13,24 +13,14 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 import os
 from pathlib import Path
-from decouple import Config, RepositoryEnv, config as conf
-from pathlib import Path
-
+from decouple import Config, RepositoryEnv
 
-try:
-    if conf('DJANGO_SETTINGS_MODULE') == 'core.settings.local':
-        config = Config(RepositoryEnv('env/local.env'))
-    elif conf('DJANGO_SETTINGS_MODULE') == 'core.settings.production':
-        config = Config(RepositoryEnv('env/production.env'))
-    else:
-        config = conf
-except (FileNotFoundError, Exception):
-    config = conf
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
-# fichier .env selon l'environnement DJANGO_SETTINGS_MODULE
+# fichier .env selon l'environnement DJANGO_SETTINGS_MODULE (manage.py a déjà chargé .env dans
+# os.environ) : un seul fichier est lu, une seule fois, à chaque démarrage
 if os.getenv('DJANGO_SETTINGS_MODULE') == 'core.settings.local':
     env_file = BASE_DIR / 'env' / 'local.env'
 else:
@@ -71,12 +61,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'app.middleware.QueryProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'app.middleware.ReplicaPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -98,6 +90,21 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'core.wsgi.application'
 
+# Bases de données : les lectures partent vers les réplicas "replica_*" (définis dans
+# local.py / production.py), les écritures et les transactions restent sur "default".
+DATABASE_ROUTERS = ['app.routers.PrimaryReplicaRouter']
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=30, cast=int)
+REPLICA_LAG_CHECK_INTERVAL = config('REPLICA_LAG_CHECK_INTERVAL', default=5, cast=int)
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+# le contrôle du retard se fait pendant la requête : une réplica injoignable ne doit pas la
+# bloquer pendant tout le timeout TCP du système (connect_timeout libpq, en secondes)
+REPLICA_CONNECT_TIMEOUT = config('REPLICA_CONNECT_TIMEOUT', default=2, cast=int)
+
+# Profilage SQL par requête (échantillonné) : nombre de requêtes, temps DB, détection N+1
+QUERY_PROFILING_SAMPLE_RATE = config('QUERY_PROFILING_SAMPLE_RATE', default=1.0, cast=float)
+QUERY_PROFILING_N_PLUS_ONE_THRESHOLD = config('QUERY_PROFILING_N_PLUS_ONE_THRESHOLD', default=5, cast=int)
+QUERY_PROFILING_EXPORT_EVERY = config('QUERY_PROFILING_EXPORT_EVERY', default=1000, cast=int)
+
 
 
 
@@ -138,17 +145,77 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Le cache "catalog" (produits, catégories, traductions) est dédié : il peut être
+# vidé par génération sans toucher au reste. CATALOG_CACHE_URL=redis://... active
+# le backend Redis (ou compatible : Valkey, KeyDB) ; l'éviction LRU y est gérée
+# par le serveur (maxmemory-policy allkeys-lru), LocMemCache est LRU en mémoire.
+# LocMemCache n'est partagé qu'au sein d'un processus : il ne convient qu'au développement
+# avec un seul processus, production.py exige CATALOG_CACHE_URL.
+
+CATALOG_CACHE_URL = config('CATALOG_CACHE_URL', default='')
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+if CATALOG_CACHE_URL:
+    CATALOG_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CATALOG_CACHE_URL,
+        'KEY_PREFIX': 'catalog',
+        'TIMEOUT': CATALOG_CACHE_TIMEOUT,
+    }
+else:
+    CATALOG_CACHE = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog',
+        'TIMEOUT': CATALOG_CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CATALOG_CACHE_MAX_ENTRIES', default=50000, cast=int),
+            'CULL_FREQUENCY': 4,
+        },
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'default',
+    },
+    'catalog': CATALOG_CACHE,
+}
+
+# Recherche plein texte des avis : durée maximale d'une requête (statement_timeout)
+REVIEW_SEARCH_TIMEOUT_MS = config('REVIEW_SEARCH_TIMEOUT_MS', default=2000, cast=int)
+
+# Journalisation : les handlers (console + fichier JSON avec rotation) tournent dans le
+# thread d'un QueueListener, l'import ne fait que déposer les records dans la file.
+LOG_DIR = BASE_DIR / 'log'
+LOG_DIR.mkdir(exist_ok=True)
+
 LOGGING = {
     "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "app.log.JsonFormatter"},
+    },
     "handlers": {
         "console": {"class": "logging.StreamHandler"},
         "file": {
-            "class": "logging.FileHandler",
-            "filename": "log/import.log",
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": str(LOG_DIR / "import.log"),
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 5,
+            "encoding": "utf-8",
+            "formatter": "json",
+        },
+        "queue": {
+            "class": "logging.handlers.QueueHandler",
+            "handlers": ["console", "file"],
+            "respect_handler_level": True,
         },
     },
     "root": {
-        "handlers": ["console", "file"],
+        "handlers": ["queue"],
         "level": "INFO",
     },
 
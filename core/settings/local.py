@@ -14,4 +14,14 @@ DATABASES = {
         'HOST': config("DATABASE_HOST"),
         'PORT': '5432',
     }
-}
\ No newline at end of file
+}
+
+# Réplica locale optionnelle (ex. deuxième instance Postgres sur un autre port)
+if config("DATABASE_REPLICA_HOST", default=""):
+    DATABASES['replica_0'] = {
+        **DATABASES['default'],
+        'HOST': config("DATABASE_REPLICA_HOST"),
+        'PORT': config("DATABASE_REPLICA_PORT", default='5432'),
+        'OPTIONS': {'connect_timeout': REPLICA_CONNECT_TIMEOUT},
+        'TEST': {'MIRROR': 'default'},
+    }
@@ -1,17 +1,41 @@
 from .base_settings import *
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from .base_settings import config
 
 DEBUG = False
 ALLOWED_HOSTS = []
 
+# LocMemCache est propre à chaque worker : une invalidation (post_save) dans un worker ne
+# toucherait pas les autres, qui serviraient un catalogue périmé jusqu'à CATALOG_CACHE_TIMEOUT
+if not CATALOG_CACHE_URL:
+    raise ImproperlyConfigured("CATALOG_CACHE_URL (redis://...) est obligatoire en production")
+
+QUERY_PROFILING_SAMPLE_RATE = config('QUERY_PROFILING_SAMPLE_RATE', default=0.01, cast=float)
+
 DATABASES = {
 
     'default': dj_database_url.parse(
         
         config("DATABASE_URL"),
-        conn_max_age=600,
+        conn_max_age=config("DATABASE_CONN_MAX_AGE", default=600, cast=int),
+        conn_health_checks=True,
         engine='django.contrib.gis.db.backends.postgis'
     
     )
-}
\ No newline at end of file
+}
+
+# DATABASE_REPLICA_URLS=postgres://...,postgres://... -> alias replica_0, replica_1, ...
+# chaque alias garde ses propres connexions persistantes
+for index, url in enumerate(config("DATABASE_REPLICA_URLS", default="", cast=lambda v: [u.strip() for u in v.split(",") if u.strip()])):
+    DATABASES[f'replica_{index}'] = dj_database_url.parse(
+        url,
+        conn_max_age=config("DATABASE_REPLICA_CONN_MAX_AGE", default=600, cast=int),
+        conn_health_checks=True,
+        engine='django.contrib.gis.db.backends.postgis',
+        test_options={'MIRROR': 'default'},
+    )
+    DATABASES[f'replica_{index}']['OPTIONS'] = {
+        **DATABASES[f'replica_{index}'].get('OPTIONS', {}),
+        'connect_timeout': REPLICA_CONNECT_TIMEOUT,
+    }
\ No newline at end of file